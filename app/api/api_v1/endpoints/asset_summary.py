@@ -1,112 +1,364 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.core.config import settings
 from app.core.mongodb import get_database
 from app.services.asset_summary_service import AssetSummaryService
-from app.schemas.asset_summary import AssetSummaryRequest, AssetSummaryResponse, AssetSummaryStatus
+from app.schemas.asset_summary import AssetSummaryRequest, AssetSummaryJob, AssetSummaryStatus
 from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
 # from app.core.security import get_current_user  # Commented out - function doesn't exist
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Summaries change rarely, so status polls are served from memory until the TTL expires
+_status_cache = TTLCache(maxsize=10_000, ttl=settings.summary_status_cache_ttl)
+_STATUS_CACHE_CONTROL = (
+    f"private, max-age={settings.summary_status_max_age}, "
+    f"stale-while-revalidate={settings.summary_status_stale_while_revalidate}"
+)
+
+# Asset IDs that recently 404'd; kept short so newly created assets show up quickly
+_notfound_cache = TTLCache(maxsize=10_000, ttl=settings.summary_status_not_found_ttl)
+
+_OID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+_MAX_BATCH_IDS = 100
+
+# Concurrent status polls for the same asset share a single Mongo call
+_inflight = SingleFlight()
+
+# Summary generations running in the background, keyed by asset_id
+_generation_tasks: Dict[str, asyncio.Task] = {}
+# Recent generation failures, reported by /status until the client retries
+_generation_errors = TTLCache(maxsize=1_000, ttl=settings.summary_status_cache_ttl)
+
+
+def _validate_oid(asset_id: str) -> None:
+    """Reject asset IDs that are not 24-character hex ObjectId strings."""
+    if not _OID_RE.match(asset_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid asset ID format"
+        )
+
+
+def _summary_etag(summary_updated_at: Optional[datetime]) -> str:
+    """Build a weak ETag that changes whenever the stored summary is updated."""
+    if summary_updated_at is None:
+        return 'W/"0"'
+    return f'W/"{int(summary_updated_at.timestamp() * 1000)}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against the current ETag."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _build_status(
+    asset_id: str,
+    summary: Optional[str],
+    summary_updated_at: Optional[datetime],
+    generation_error: Optional[str] = None
+) -> AssetSummaryStatus:
+    """Build the status payload for an asset from its cached summary fields."""
+    has_summary = bool(summary) and not summary.isspace()
+    return AssetSummaryStatus.model_construct(
+        success=True,
+        message="Summary found" if has_summary else "No summary available",
+        asset_id=asset_id,
+        summary=summary,
+        summary_updated_at=summary_updated_at,
+        generation_status="failed" if generation_error else None,
+        error=generation_error
+    )
+
+
+def _status_response(payload: AssetSummaryStatus, headers: Dict[str, str]) -> ORJSONResponse:
+    """
+    Render a status payload built with model_construct from trusted Mongo fields.
+    Returning the response directly skips FastAPI's response_model re-validation;
+    response_model is kept on the route for the OpenAPI schema.
+    """
+    return ORJSONResponse(payload.model_dump(), headers=headers)
+
+
+def get_asset_summary_service(request: Request) -> AssetSummaryService:
+    """Return the AssetSummaryService built at startup, creating it on first use if needed."""
+    service = getattr(request.app.state, "asset_summary_service", None)
+    if service is None:
+        service = AssetSummaryService(get_database())
+        request.app.state.asset_summary_service = service
+    return service
 
 
-@router.post("/generate", response_model=AssetSummaryResponse)
+async def _generate_summary(service: AssetSummaryService, asset_id: str):
+    """Generate and store a summary, dropping any cached status for the asset."""
+    try:
+        await service.generate_and_update_summary(asset_id)
+    except Exception as e:
+        logger.error(f"Background summary generation failed for asset {asset_id}: {e}")
+        _generation_errors.set(asset_id, str(e))
+    finally:
+        _status_cache.pop(asset_id)
+        _generation_tasks.pop(asset_id, None)
+
+
+def _start_generation(service: AssetSummaryService, asset_id: str) -> None:
+    """Schedule summary generation unless one is already running for the asset."""
+    if asset_id in _generation_tasks:
+        return
+    _generation_errors.pop(asset_id)
+    _generation_tasks[asset_id] = asyncio.create_task(_generate_summary(service, asset_id))
+
+
+async def _stream_summary_into(service: AssetSummaryService, asset_id: str, queue: asyncio.Queue):
+    """
+    Generate and store a summary, passing its text deltas to ``queue``. The run ends with None,
+    preceded by the exception if it failed, and keeps going if the streaming client disconnects.
+    """
+    try:
+        async for delta in service.stream_summary(asset_id):
+            queue.put_nowait(delta)
+    except Exception as e:
+        logger.error(f"Streaming summary generation failed for asset {asset_id}: {e}")
+        _generation_errors.set(asset_id, str(e))
+        queue.put_nowait(e)
+    finally:
+        queue.put_nowait(None)
+        _status_cache.pop(asset_id)
+        _generation_tasks.pop(asset_id, None)
+
+
+async def _load_asset(service: AssetSummaryService, asset_id: str):
+    """Fetch an asset's summary fields from Mongo and cache them for subsequent status polls."""
+    asset = await service.get_asset_summary_fields(asset_id)
+    if not asset:
+        _notfound_cache.set(asset_id, True)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found"
+        )
+    _status_cache.set(asset_id, asset)
+    return asset
+
+
+@router.post("/generate", response_model=AssetSummaryJob, status_code=status.HTTP_202_ACCEPTED)
 async def generate_asset_summary(
     request: AssetSummaryRequest,
+    asset_summary_service: AssetSummaryService = Depends(get_asset_summary_service),
     # current_user: User = Depends(get_current_user)  # Commented out - function doesn't exist
 ):
     """
-    Generate a summary for an asset using AI.
+    Start generating a summary for an asset using AI.
+    Returns immediately; poll the status endpoint for the result.
     Requires authentication.
     """
-    try:
-        # Validate asset ID format
-        from bson import ObjectId
-        try:
-            ObjectId(request.asset_id)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid asset ID format"
-            )
-        
-        db = get_database()
-        if db is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database connection not available"
-            )
-        
-        asset_summary_service = AssetSummaryService(db)
-        
-        # Generate and update summary
-        updated_asset = await asset_summary_service.generate_and_update_summary(request.asset_id)
-        
-        if not updated_asset:
+    # Validate asset ID format
+    _validate_oid(request.asset_id)
+    
+    if request.asset_id not in _generation_tasks:
+        asset = await asset_summary_service.get_asset_summary_fields(request.asset_id)
+        if not asset:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Asset not found or summary generation failed"
+                detail="Asset not found"
             )
-        
-        return updated_asset
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    
+    _notfound_cache.pop(request.asset_id)
+    
+    # Generate and update summary in the background
+    _start_generation(asset_summary_service, request.asset_id)
+    
+    return AssetSummaryJob(
+        success=True,
+        message="Summary generation started",
+        asset_id=request.asset_id,
+        status="pending",
+        status_url=f"{settings.api_v1_prefix}/asset-summary/status/{request.asset_id}"
+    )
+
+
+@router.post("/generate/stream")
+async def stream_asset_summary(
+    request: AssetSummaryRequest,
+    asset_summary_service: AssetSummaryService = Depends(get_asset_summary_service),
+    # current_user: User = Depends(get_current_user)  # Commented out - function doesn't exist
+):
+    """
+    Generate a summary for an asset and stream it as Server-Sent Events.
+    Each event carries a text delta; the last one carries the stored summary or an error.
+    Answers 409 while another generation for the asset is running; poll the status endpoint instead.
+    Requires authentication.
+    """
+    # Validate asset ID format
+    _validate_oid(request.asset_id)
+    asset_id = request.asset_id
+    
+    asset = await asset_summary_service.get_asset_summary_fields(asset_id)
+    if not asset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found"
+        )
+    _notfound_cache.pop(asset_id)
+    
+    # The generation runs as its own task, registered like a /generate job, so a concurrent
+    # /generate joins it instead of racing it to store a second summary
+    if asset_id in _generation_tasks:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Summary generation failed: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Summary generation already in progress for this asset"
         )
+    _generation_errors.pop(asset_id)
+    queue: asyncio.Queue = asyncio.Queue()
+    _generation_tasks[asset_id] = asyncio.create_task(
+        _stream_summary_into(asset_summary_service, asset_id, queue)
+    )
+    
+    async def stream_generator():
+        parts = []
+        while (delta := await queue.get()) is not None:
+            if isinstance(delta, Exception):
+                yield f"data: {orjson.dumps({'done': True, 'error': str(delta)}).decode()}\n\n"
+                return
+            parts.append(delta)
+            yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
+        yield f"data: {orjson.dumps({'done': True, 'summary': ' '.join(''.join(parts).split())}).decode()}\n\n"
+    
+    return StreamingResponse(
+        stream_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/status", response_model=List[AssetSummaryStatus])
+async def get_asset_summary_statuses(
+    ids: str = Query(..., description="Comma-separated asset IDs"),
+    asset_summary_service: AssetSummaryService = Depends(get_asset_summary_service),
+    # current_user: User = Depends(get_current_user)  # Commented out - function doesn't exist
+):
+    """
+    Get the summary status for several assets with a single database query.
+    Results follow the order of the requested IDs; unknown assets are reported with success=False.
+    Requires authentication.
+    """
+    asset_ids = [asset_id.strip() for asset_id in ids.split(",") if asset_id.strip()]
+    if not asset_ids or len(asset_ids) > _MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {_MAX_BATCH_IDS} asset IDs are required"
+        )
+    for asset_id in asset_ids:
+        _validate_oid(asset_id)
+    
+    assets = {}
+    missing = []
+    for asset_id in dict.fromkeys(asset_ids):
+        asset = _status_cache.get(asset_id)
+        if asset is not None:
+            assets[asset_id] = asset
+        elif asset_id not in _notfound_cache:
+            missing.append(asset_id)
+    
+    if missing:
+        # Raises on database errors, so only IDs a successful query did not return are negative-cached
+        found = await asset_summary_service.get_asset_summary_fields_many(missing)
+        for asset_id in missing:
+            asset = found.get(asset_id)
+            if asset is None:
+                _notfound_cache.set(asset_id, True)
+            else:
+                _status_cache.set(asset_id, asset)
+                assets[asset_id] = asset
+    
+    results = []
+    for asset_id in asset_ids:
+        asset = assets.get(asset_id)
+        if asset_id in _generation_tasks:
+            payload = AssetSummaryStatus.model_construct(
+                success=True,
+                message="Summary generation in progress",
+                asset_id=asset_id,
+                generation_status="pending"
+            )
+        elif asset is None:
+            payload = AssetSummaryStatus.model_construct(
+                success=False,
+                message="Asset not found",
+                asset_id=asset_id
+            )
+        else:
+            payload = _build_status(
+                asset_id,
+                asset.get("summary"),
+                asset.get("summary_updated_at"),
+                _generation_errors.get(asset_id)
+            )
+        results.append(payload.model_dump())
+    
+    return ORJSONResponse(results, headers={"Cache-Control": "no-store"})
 
 
 @router.get("/status/{asset_id}", response_model=AssetSummaryStatus)
 async def get_asset_summary_status(
     asset_id: str,
+    request: Request,
+    asset_summary_service: AssetSummaryService = Depends(get_asset_summary_service),
     # current_user: User = Depends(get_current_user)  # Commented out - function doesn't exist
 ):
     """
     Get the summary status for an asset.
+    Supports If-None-Match and answers 304 while the summary is unchanged.
     Requires authentication.
     """
-    try:
-        # Validate asset ID format
-        from bson import ObjectId
-        try:
-            ObjectId(asset_id)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid asset ID format"
-            )
-        
-        db = get_database()
-        if db is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database connection not available"
-            )
-        
-        asset_summary_service = AssetSummaryService(db)
-        asset = await asset_summary_service.get_asset_by_id(asset_id)
-        
-        if not asset:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Asset not found"
-            )
-        
-        has_summary = asset.get("summary") is not None and asset.get("summary").strip() != ""
-        
-        return AssetSummaryStatus(
-            success=True,
-            message="Summary found" if has_summary else "No summary available",
-            asset_id=asset_id,
-            summary=asset.get("summary"),
-            summary_updated_at=asset.get("summary_updated_at")
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    # Validate asset ID format
+    _validate_oid(asset_id)
+    
+    if asset_id in _notfound_cache:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get summary status: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found"
+        )
+    
+    if asset_id in _generation_tasks:
+        return _status_response(
+            AssetSummaryStatus.model_construct(
+                success=True,
+                message="Summary generation in progress",
+                asset_id=asset_id,
+                generation_status="pending"
+            ),
+            {"Cache-Control": "no-store"}
         )
+    
+    asset = _status_cache.get(asset_id)
+    if asset is None:
+        asset = await _inflight.do(f"status:{asset_id}", lambda: _load_asset(asset_summary_service, asset_id))
+    
+    summary_updated_at = asset.get("summary_updated_at")
+    generation_error = _generation_errors.get(asset_id)
+    if generation_error:
+        headers = {"Cache-Control": "no-store"}
+    else:
+        etag = _summary_etag(summary_updated_at)
+        headers = {"ETag": etag, "Cache-Control": _STATUS_CACHE_CONTROL}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return _status_response(
+        _build_status(asset_id, asset.get("summary"), summary_updated_at, generation_error),
+        headers
+    )
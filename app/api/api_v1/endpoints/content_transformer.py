@@ -1,32 +1,217 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import AsyncIterator, Optional, Set
+import asyncio
+import json
 import logging
-import google.generativeai as genai
-from datetime import datetime
+from app.core.gemini import get_gemini_model
+from bson import ObjectId
+from pymongo import ReturnDocument
+from datetime import datetime, timezone
 from app.core.config import settings
 from app.core.mongodb import get_database
+from app.core import course_cache, llm_cache
+from app.core.mongo_batcher import mongo_batcher
+from app.utils.cache import TTLCache
+from app.utils.response import MongoJSONResponse
+from app.utils.singleflight import SingleFlight
+from app.prompts.transformer import build_prompt, build_profile_prompt, postprocess
 # Visual cues are text-based, no service needed
 from app.schemas.content_transformer import (
     ContentTransformerRequest,
     ContentTransformerResponse,
     ContentTransformerError
 )
+from app.schemas.user_asset_status import AssetStatus
 
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
 router = APIRouter()
 
 # Configure Google Generative AI
-if settings.google_api_key:
-    genai.configure(api_key=settings.google_api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-else:
-    model = None
+model = get_gemini_model()
+if model is None:
     logger.warning("Google API key not configured")
 
+# Bounds concurrent Gemini calls per worker to stay within the API rate limits.
+# Calls already share the SDK's single gRPC (HTTP/2) channel through the module-level
+# model, so concurrent requests are multiplexed rather than opening new connections.
+_gemini_semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+
+# List endpoints leave out the large text fields unless asked for them
+_LIST_PROJECTION = {"content": 0, "original_content": 0}
+# Fields of a userassetstatus record returned by /updateAsset
+_STATUS_PROJECTION = {
+    "course": 1, "asset": 1, "user": 1, "status": 1, "progress": 1,
+    "created_at": 1, "updated_at": 1, "last_accessed": 1
+}
+# Status values accepted by /updateAsset
+_VALID_STATUSES = frozenset(s.value for s in AssetStatus)
+
+# Recent /getAsset lookups, so a hot asset code costs one Mongo query per TTL window
+_asset_lookup_cache = TTLCache(maxsize=10_000, ttl=settings.asset_lookup_cache_ttl)
+_asset_lookup_inflight = SingleFlight()
+# Bumped by _invalidate_asset_lookup so a lookup that started before a write neither caches
+# what it read nor is joined by requests arriving after the write
+_asset_lookup_generation = 0
+# /getAsset variants being generated after the response, so repeat misses do not queue duplicates
+_pending_generations: Set[tuple] = set()
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _generate_content(prompt: str):
+    """Call Gemini without blocking the event loop."""
+    async with _gemini_semaphore:
+        return await model.generate_content_async(prompt)
+
+
+async def _stream_text(prompt: str) -> AsyncIterator[str]:
+    """
+    Yield Gemini output for a prompt as it arrives. A concurrency slot is held only while waiting on
+    Gemini, never while the caller handles a chunk, so a slow or disconnected client cannot starve others.
+    """
+    async with _gemini_semaphore:
+        response = await model.generate_content_async(prompt, stream=True)
+    chunks = response.__aiter__()
+    while True:
+        async with _gemini_semaphore:
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+        if chunk.text:
+            yield chunk.text
+
+
+async def _generate_text(cache_key: str, prompt: str) -> Optional[str]:
+    """Return the Gemini completion for a prompt, reusing earlier results for the same inputs."""
+    async def generate():
+        response = await _generate_content(prompt)
+        return response.text
+    return await llm_cache.get_or_set(cache_key, generate)
+
+
+def _maybe_oid(value: str):
+    """Return the value as an ObjectId when it is a valid one, otherwise unchanged."""
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+
+async def _find_asset_matches(db, key: tuple, pipeline: list) -> dict:
+    """Run the /getAsset lookup pipeline once per key and TTL window, sharing it between concurrent callers."""
+    matches = _asset_lookup_cache.get(key)
+    if matches is None:
+        generation = _asset_lookup_generation
+        
+        async def load():
+            facets = await db["assets"].aggregate(pipeline).to_list(1)
+            result = facets[0] if facets else {}
+            if generation == _asset_lookup_generation:
+                _asset_lookup_cache.set(key, result)
+            return result
+        matches = await _asset_lookup_inflight.do((key, generation), load)
+    # Callers rewrite fields for the response, so hand out copies of the cached documents
+    return {name: [dict(document) for document in documents] for name, documents in matches.items()}
+
+
+def _invalidate_asset_lookup(lookup_key: tuple) -> None:
+    """Drop the cached /getAsset lookup for ``lookup_key`` after a write that changes its result."""
+    global _asset_lookup_generation
+    _asset_lookup_generation += 1
+    _asset_lookup_cache.pop(lookup_key)
+
+
+async def _generate_variant(db, lookup_key: tuple, code_as_objectid, original_content: str) -> dict:
+    """Generate a style variant of an asset from its original content and store it in the assets collection."""
+    code, domain, hobby, style = lookup_key
+    logger.info("Generating new %s content for code=%s using original content", style, code)
+    
+    # Create the AI prompt
+    prompt = build_profile_prompt(style, original_content, domain, hobby)
+
+    # Generate response using Google Generative AI
+    response = await _generate_content(prompt)
+    
+    if not response.text:
+        raise ValueError("AI failed to generate content")
+    
+    # Insert the new generated content into assets collection
+    now = datetime.now(_UTC)
+    new_asset_data = {
+        "code": code_as_objectid,
+        "content": postprocess(response.text),
+        "style": style,
+        "domain": domain,
+        "hobby": hobby,
+        "created_at": now,
+        "updated_at": now,
+        "status": "not-started"
+    }
+    
+    result = await db["assets"].insert_one(new_asset_data)
+    _invalidate_asset_lookup(lookup_key)
+    course_cache.invalidate()
+    # insert_one stored the generated _id on the dict; expose it as id like the other matches
+    new_asset_data["id"] = new_asset_data.pop("_id", result.inserted_id)
+    
+    logger.info("Successfully generated and inserted new %s content for code=%s", style, code)
+    return new_asset_data
+
+
+async def _generate_variant_in_background(db, lookup_key: tuple, code_as_objectid, original_content: str) -> None:
+    """Run _generate_variant after the response, logging instead of raising since nobody awaits it."""
+    try:
+        await _generate_variant(db, lookup_key, code_as_objectid, original_content)
+    except Exception as e:
+        logger.error(f"Failed to generate {lookup_key[3]} content for code={lookup_key[0]}: {str(e)}")
+    finally:
+        _pending_generations.discard(lookup_key)
+
+
+def _run_in_background(coro) -> None:
+    """Schedule a coroutine without awaiting it, keeping it alive until it finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _saved(collection: str, lookup_key: Optional[tuple] = None) -> None:
+    """
+    Drop cached reads a newly written document affects. The /getAsset lookup cached under ``lookup_key``
+    is dropped once the write has landed, so a lookup made while the write was pending does not keep serving the miss.
+    """
+    if lookup_key is not None:
+        _invalidate_asset_lookup(lookup_key)
+    if collection == "assets":
+        course_cache.invalidate()
+
+
+async def _save(db, collection: str, document: dict, lookup_key: Optional[tuple] = None) -> None:
+    """Insert a generated document for a caller that waits on the write; a single insert_one skips the batch window."""
+    await db[collection].insert_one(document)
+    _saved(collection, lookup_key)
+
+
+async def _persist(db, collection: str, document: dict, lookup_key: Optional[tuple] = None) -> None:
+    """
+    Insert a generated document after the response through the shared micro-batcher,
+    logging instead of raising since nobody awaits it.
+    """
+    try:
+        inserted_id = await mongo_batcher.submit(db, collection, document)
+        _saved(collection, lookup_key)
+        logger.info("Saved %s content to %s as %s", document['style'], collection, inserted_id)
+    except Exception as e:
+        logger.error(f"Failed to save {document['style']} content to {collection}: {str(e)}")
+
+
 @router.post(
     "/transform",
-    response_model=ContentTransformerResponse,
+    response_model=None,
+    response_class=ORJSONResponse,
     status_code=status.HTTP_200_OK,
     summary="Transform Content",
     description="Transform content into storytelling, visual_cue, and summary modes based on domain and hobby.",
@@ -44,7 +229,12 @@ else:
         }
     }
 )
-async def transform_content(request: ContentTransformerRequest, db=Depends(get_database)):
+async def transform_content(
+    request: ContentTransformerRequest,
+    background_tasks: BackgroundTasks,
+    sync: bool = Query(False, description="Wait for the asset to be saved before responding"),
+    db=Depends(get_database)
+):
     """
     Transform content based on the selected style, domain, and hobby, then save to database.
     
@@ -54,165 +244,78 @@ async def transform_content(request: ContentTransformerRequest, db=Depends(get_d
     - **domain**: Domain context (e.g., Business, Engineering, Medicine, Education)
     - **hobby**: Hobby context (e.g., Movies, Cricket, Gaming, Music)
     
-    Returns transformed content and saves it to the transformed-assets collection.
+    Returns transformed content and saves it to the assets collection after responding,
+    or before responding when **sync** is true.
     """
     try:
-        logger.info(f"Transforming content for assetCode: {request.assetCode}, style: {request.style}, domain: {request.domain}, hobby: {request.hobby}")
-        
-        if not model:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Google Generative AI not configured. Please check API key."
-            )
-        
-        # Create style-specific prompts
-        style_prompts = {
-            "storytelling": """
-### Storytelling Mode:
-- Convert the given content into a short storytelling analogy.
-- Make it relevant to the given domain and hobby.
-- Use simple, engaging language.
-- Create a narrative that helps explain the concept through a relatable story.
-""",
-          "visual_cue": """
-### Visual Cue Mode:
-- Convert the content into simple, symbolic visual representations (emoji flows, ASCII diagrams, metaphors).
-- Focus on clarity, simplicity, and instant understanding at a glance.
-- Provide 3–4 different cues for the same concept.
-- Each visual cue must connect the concept to the user's domain and hobby.
-- Use emojis, arrows, or short symbolic flows instead of long text.
-- Keep it fun, relatable, and visually intuitive.
-
-Format your response as:
-VISUAL CUE 1: [Emoji flow or diagram]
-VISUAL CUE 2: [Emoji flow or diagram]
-VISUAL CUE 3: [Emoji flow or diagram]
-VISUAL CUE 4: [Optional extra if needed]
-""",
-            "summary": """
-### Summary Mode:
-- Generate a concise summary of the content.
-- Keep it framed in the context of the given domain and hobby.
-- Make it clear, informative, and easy to understand.
-- Use analogies from the hobby to explain domain concepts.
-""",
-            "original": """
-### Original Mode:
-- Return the content as-is without any transformation.
-- This is the original learning material in its basic form.
-- No domain or hobby contextualization needed.
-"""
-        }
+        logger.info("Transforming content for assetCode: %s, style: %s, domain: %s, hobby: %s", request.assetCode, request.style, request.domain, request.hobby)
         
         # Handle original style without AI transformation
         if request.style == "original":
             output = request.content
         else:
+            if not model:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Google Generative AI not configured. Please check API key."
+                )
+            
             # Create the AI prompt based on selected style
-            prompt = f"""You are an AI content transformer. 
-You will receive four inputs:
-1. Style (storytelling, visual_cue, or summary)
-2. Content (raw lecture, case study, or concept)
-3. Domain (e.g., Business, Engineering, Medicine, Education, etc.)
-4. Hobby (e.g., Movies, Cricket, Gaming, Music, etc.)
-
-Your task is to generate content in the specified style:
-
-{style_prompts[request.style]}
-
-### Examples for {request.style.title()} Mode:
-
-**Content:** "Neural networks learn patterns from data."
-**Domain:** Business
-**Hobby:** Cricket
-
-**Storytelling Mode Example:** 
-"Imagine a cricket coach who studies thousands of player stats (data) to predict the best batting order. That's how neural networks learn patterns to make predictions."
-
-**Visual Cue Mode Example:** 
-VISUAL CUE 1: 🏏📊➡️🧠➡️🎯 (Cricket data → Neural Network → Target prediction)
-VISUAL CUE 2: 📈📋➡️🤖➡️💼 (Business charts → AI brain → Better decisions)  
-VISUAL CUE 3: Data ➡️ NN ➡️ Pattern ➡️ 🏆 (Linear flow to success)
-VISUAL CUE 4: 🧠=🏏coach (Neural Network equals cricket coach analogy)
-
-**Summary Mode Example:** 
-"Neural networks are like a cricket coach for business — analyzing tons of data to spot patterns and make smarter predictions."
-
----
-
-Now transform this content in {request.style} style:
-
-**Style:** {request.style}
-**Content:** "{request.content}"
-**Domain:** {request.domain}
-**Hobby:** {request.hobby}
-
-Please provide ONLY the {request.style} output without any formatting or labels:"""
+            prompt = build_prompt(request.style.value, request.content, request.domain, request.hobby)
 
             # Generate response using Google Generative AI
-            response = model.generate_content(prompt)
+            text = await _generate_text(
+                llm_cache.make_key("transform", request.style, request.domain, request.hobby, request.content),
+                prompt
+            )
             
-            if not response.text:
+            if not text:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to generate content transformation"
                 )
             
             # Parse the response - since we asked for only the output, use it directly
-            output = response.text.strip()
-        
-        # Clean up any unwanted formatting
-        if output.startswith('"') and output.endswith('"'):
-            output = output[1:-1]
-        
-        # Visual cues are text-based, no image generation needed
-        visual_cue_data = None
+            output = postprocess(text)
         
         # Prepare data for insertion into assets collection
         # content field stores the generated content (not original)
-        from bson import ObjectId
-        
-        # Convert assetCode to ObjectId if it's a valid ObjectId string
-        try:
-            code_as_objectid = ObjectId(request.assetCode)
-        except Exception:
-            # If not a valid ObjectId, keep as string
-            code_as_objectid = request.assetCode
+        code_as_objectid = _maybe_oid(request.assetCode)
         
         asset_data = {
+            "_id": ObjectId(),
             "code": code_as_objectid,
             "content": output,  # Generated content goes in content field
             "style": request.style,
             "domain": request.domain,
             "hobby": request.hobby,
-            "created_at": datetime.utcnow()
+            "created_at": datetime.now(_UTC)
         }
         
         # Visual cues are text-based only, no image data to add
         
-        # Insert into MongoDB assets collection only
-        asset_result = await db["assets"].insert_one(asset_data)
+        # Insert into MongoDB assets collection only; the ID is assigned here so the
+        # response does not have to wait for the write unless sync is requested
+        lookup_key = (request.assetCode, request.domain, request.hobby, request.style.value)
+        if sync:
+            await _save(db, "assets", asset_data, lookup_key)
+        else:
+            background_tasks.add_task(_persist, db, "assets", asset_data, lookup_key)
         
-        if not asset_result.inserted_id:
-            logger.error("Failed to insert data into assets collection")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to save data to database"
-            )
+        logger.info("Successfully transformed content for assetCode: %s, style: %s", request.assetCode, request.style)
+        logger.info("Asset ID: %s", asset_data['_id'])
         
-        logger.info(f"Successfully transformed and saved content for assetCode: {request.assetCode}, style: {request.style}")
-        logger.info(f"Asset ID: {asset_result.inserted_id}")
-        
-        return ContentTransformerResponse(
-            id=str(asset_result.inserted_id),
-            assetCode=request.assetCode,
-            style=request.style,
-            output=output,
-            original_content="",  # Not storing original content anymore
-            domain=request.domain,
-            hobby=request.hobby,
-            created_at=asset_data["created_at"].isoformat()
-        )
+        return ORJSONResponse({
+            "id": str(asset_data["_id"]),
+            "assetCode": request.assetCode,
+            "style": request.style.value,
+            "output": output,
+            "original_content": "",  # Not storing original content anymore
+            "domain": request.domain,
+            "hobby": request.hobby,
+            "created_at": asset_data["created_at"].isoformat(),
+            "error": None
+        })
         
     except HTTPException:
         raise
@@ -223,11 +326,82 @@ Please provide ONLY the {request.style} output without any formatting or labels:
             detail=f"Failed to transform content: {str(e)}"
         )
 
+@router.post(
+    "/transform/stream",
+    summary="Transform Content (streaming)",
+    description="Transform content like /transform, streaming the generated text as Server-Sent Events."
+)
+async def transform_content_stream(request: ContentTransformerRequest, db=Depends(get_database)):
+    """
+    Transform content and stream the output as it is generated.
+    
+    Each event carries a `delta` of generated text; the final event carries the cleaned
+    `output`, or an `error`. The result is saved to the assets collection once the stream completes.
+    """
+    logger.info("Streaming transform for assetCode: %s, style: %s, domain: %s, hobby: %s", request.assetCode, request.style, request.domain, request.hobby)
+    
+    if request.style != "original" and not model:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Google Generative AI not configured. Please check API key."
+        )
+    
+    cache_key = llm_cache.make_key("transform", request.style, request.domain, request.hobby, request.content)
+    
+    async def sse_generator():
+        try:
+            if request.style == "original":
+                output = request.content
+                yield f"data: {json.dumps({'delta': output})}\n\n"
+            else:
+                text = llm_cache.get(cache_key)
+                if text:
+                    yield f"data: {json.dumps({'delta': text})}\n\n"
+                else:
+                    prompt = build_prompt(request.style.value, request.content, request.domain, request.hobby)
+                    parts = []
+                    async for delta in _stream_text(prompt):
+                        parts.append(delta)
+                        yield f"data: {json.dumps({'delta': delta})}\n\n"
+                    text = "".join(parts)
+                    llm_cache.put(cache_key, text)
+                
+                output = postprocess(text)
+                if not output:
+                    raise ValueError("Failed to generate content transformation")
+            
+            # Save after the stream completes without holding the connection open for the write
+            _run_in_background(_persist(db, "assets", {
+                "code": _maybe_oid(request.assetCode),
+                "content": output,
+                "style": request.style.value,
+                "domain": request.domain,
+                "hobby": request.hobby,
+                "created_at": datetime.now(_UTC)
+            }, (request.assetCode, request.domain, request.hobby, request.style.value)))
+            yield f"data: {json.dumps({'done': True, 'output': output})}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming content transformation: {str(e)}")
+            yield f"data: {json.dumps({'done': True, 'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        sse_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
 @router.get(
     "/get-or-generate",
-    response_model=ContentTransformerResponse,
+    response_model=None,
+    response_class=ORJSONResponse,
     summary="Get or Generate Transformed Content",
-    description="Check if transformed content exists for the combination (assetCode, style, domain, hobby). If exists, return it; otherwise generate and save new content."
+    description="Check if transformed content exists for the combination (assetCode, style, domain, hobby). If exists, return it; otherwise generate and save new content.",
+    responses={
+        200: {
+            "description": "Existing or newly generated content",
+            "model": ContentTransformerResponse
+        }
+    }
 )
 async def get_or_generate_content(
     assetCode: str,
@@ -235,6 +409,8 @@ async def get_or_generate_content(
     content: str,
     domain: str,
     hobby: str,
+    background_tasks: BackgroundTasks,
+    sync: bool = Query(False, description="Wait for newly generated content to be saved before responding"),
     db=Depends(get_database)
 ):
     """
@@ -249,17 +425,10 @@ async def get_or_generate_content(
     Returns existing content if found, otherwise generates and saves new content.
     """
     try:
-        logger.info(f"Checking for existing content: assetCode={assetCode}, style={style}, domain={domain}, hobby={hobby}")
+        logger.info("Checking for existing content: assetCode=%s, style=%s, domain=%s, hobby=%s", assetCode, style, domain, hobby)
         
         # Check if record already exists with the same combination
-        from bson import ObjectId
-        
-        # Try to convert assetCode to ObjectId for search
-        try:
-            search_code = ObjectId(assetCode)
-        except Exception:
-            # If not a valid ObjectId, search as string
-            search_code = assetCode
+        search_code = _maybe_oid(assetCode)
         
         existing_record = await db["transformed-assets"].find_one({
             "assetCode": search_code,
@@ -270,162 +439,83 @@ async def get_or_generate_content(
         
         if existing_record:
             # Record exists, return it
-            logger.info(f"Found existing record for assetCode: {assetCode}")
-            existing_record["id"] = str(existing_record["_id"])
-            del existing_record["_id"]
-            
-            return ContentTransformerResponse(
-                id=existing_record["id"],
-                assetCode=existing_record["assetCode"],
-                style=existing_record["style"],
-                output=existing_record["content"],
-                original_content=existing_record["original_content"],
-                domain=existing_record["domain"],
-                hobby=existing_record["hobby"],
-                created_at=existing_record["created_at"].isoformat()
-            )
+            logger.info("Found existing record for assetCode: %s", assetCode)
+            return ORJSONResponse({
+                "id": str(existing_record["_id"]),
+                "assetCode": str(existing_record["assetCode"]),
+                "style": existing_record["style"],
+                "output": existing_record["content"],
+                "original_content": existing_record["original_content"],
+                "domain": existing_record["domain"],
+                "hobby": existing_record["hobby"],
+                "created_at": existing_record["created_at"].isoformat(),
+                "error": None
+            })
         
         # Record doesn't exist, generate new content
-        logger.info(f"No existing record found, generating new content for assetCode: {assetCode}")
-        
-        if not model:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Google Generative AI not configured. Please check API key."
-            )
-        
-        # Create style-specific prompts
-        style_prompts = {
-            "storytelling": """
-### Storytelling Mode:
-- Convert the given content into a short storytelling analogy.
-- Make it relevant to the given domain and hobby.
-- Use simple, engaging language.
-- Create a narrative that helps explain the concept through a relatable story.
-""",
-            "visual_cue": """
-### Visual Cue Mode:
-- Convert the content into simple, symbolic visual representations (emoji flows, ASCII diagrams, metaphors).
-- Focus on clarity, simplicity, and instant understanding at a glance.
-- Provide 3–4 different cues for the same concept.
-- Each visual cue must connect the concept to the user's domain and hobby.
-- Use emojis, arrows, or short symbolic flows instead of long text.
-- Keep it fun, relatable, and visually intuitive.
-
-Format your response as:
-VISUAL CUE 1: [Emoji flow or diagram]
-VISUAL CUE 2: [Emoji flow or diagram]
-VISUAL CUE 3: [Emoji flow or diagram]
-VISUAL CUE 4: [Optional extra if needed]
-""",
-            "summary": """
-### Summary Mode:
-- Generate a concise summary of the content.
-- Keep it framed in the context of the given domain and hobby.
-- Make it clear, informative, and easy to understand.
-- Use analogies from the hobby to explain domain concepts.
-"""
-        }
-        
-        # Create the AI prompt based on selected style
-        prompt = f"""You are an AI content transformer. 
-You will receive four inputs:
-1. Style (storytelling, visual_cue, or summary)
-2. Content (raw lecture, case study, or concept)
-3. Domain (e.g., Business, Engineering, Medicine, Education, etc.)
-4. Hobby (e.g., Movies, Cricket, Gaming, Music, etc.)
-
-Your task is to generate content in the specified style:
-
-{style_prompts.get(style, style_prompts["summary"])}
-
-### Examples for {style.title()} Mode:
-
-**Content:** "Neural networks learn patterns from data."
-**Domain:** Business
-**Hobby:** Cricket
-
-**Storytelling Mode Example:** 
-"Imagine a cricket coach who studies thousands of player stats (data) to predict the best batting order. That's how neural networks learn patterns to make predictions."
-
-**Visual Cue Mode Example:** 
-VISUAL CUE 1: 🏏📊➡️🧠➡️🎯 (Cricket data → Neural Network → Target prediction)
-VISUAL CUE 2: 📈📋➡️🤖➡️💼 (Business charts → AI brain → Better decisions)  
-VISUAL CUE 3: Data ➡️ NN ➡️ Pattern ➡️ 🏆 (Linear flow to success)
-VISUAL CUE 4: 🧠=🏏coach (Neural Network equals cricket coach analogy)
-
-**Summary Mode Example:** 
-"Neural networks are like a cricket coach for business — analyzing tons of data to spot patterns and make smarter predictions."
-
----
-
-Now transform this content in {style} style:
-
-**Style:** {style}
-**Content:** "{content}"
-**Domain:** {domain}
-**Hobby:** {hobby}
-
-Please provide ONLY the {style} output without any formatting or labels:"""
-
-        # Generate response using Google Generative AI
-        response = model.generate_content(prompt)
+        logger.info("No existing record found, generating new content for assetCode: %s", assetCode)
         
-        if not response.text:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate content transformation"
+        # Original style is stored as-is without AI transformation
+        if style == "original":
+            output = content
+        else:
+            if not model:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Google Generative AI not configured. Please check API key."
+                )
+            
+            # Create the AI prompt based on selected style
+            prompt = build_prompt(style, content, domain, hobby)
+            
+            # Generate response using Google Generative AI
+            text = await _generate_text(
+                llm_cache.make_key("transform", style, domain, hobby, content),
+                prompt
             )
-        
-        # Parse the response
-        output = response.text.strip()
-        
-        # Clean up any unwanted formatting
-        if output.startswith('"') and output.endswith('"'):
-            output = output[1:-1]
+            
+            if not text:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to generate content transformation"
+                )
+            
+            # Parse the response
+            output = postprocess(text)
         
         # Prepare data for insertion into transformed-assets collection
-        from bson import ObjectId
-        
-        # Convert assetCode to ObjectId if it's a valid ObjectId string
-        try:
-            code_as_objectid = ObjectId(assetCode)
-        except Exception:
-            # If not a valid ObjectId, keep as string
-            code_as_objectid = assetCode
+        code_as_objectid = _maybe_oid(assetCode)
         
         transformed_asset = {
+            "_id": ObjectId(),
             "assetCode": code_as_objectid,
             "style": style,
             "content": output,
             "original_content": content,
             "domain": domain,
             "hobby": hobby,
-            "created_at": datetime.utcnow()
+            "created_at": datetime.now(_UTC)
         }
         
-        # Insert into MongoDB transformed-assets collection
-        result = await db["transformed-assets"].insert_one(transformed_asset)
+        # Insert into MongoDB transformed-assets collection, after responding unless sync is requested
+        if sync:
+            await _save(db, "transformed-assets", transformed_asset)
+        else:
+            background_tasks.add_task(_persist, db, "transformed-assets", transformed_asset)
         
-        if not result.inserted_id:
-            logger.error("Failed to insert transformed content into database")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to save transformed content to database"
-            )
+        logger.info("Successfully generated new content for assetCode: %s", assetCode)
         
-        logger.info(f"Successfully generated and saved new content for assetCode: {assetCode}")
-        
-        return ContentTransformerResponse(
-            id=str(result.inserted_id),
-            assetCode=assetCode,
-            style=style,
-            output=output,
-            original_content=content,
-            domain=domain,
-            hobby=hobby,
-            created_at=transformed_asset["created_at"].isoformat()
-        )
+        return ORJSONResponse({
+            "id": str(transformed_asset["_id"]),
+            "assetCode": assetCode,
+            "style": style,
+            "output": output,
+            "original_content": content,
+            "domain": domain,
+            "hobby": hobby,
+            "created_at": transformed_asset["created_at"].isoformat(),
+            "error": None
+        })
         
     except HTTPException:
         raise
@@ -439,30 +529,41 @@ Please provide ONLY the {style} output without any formatting or labels:"""
 @router.get(
     "/assets/{asset_code}",
     summary="Get Transformed Assets by Asset Code",
-    description="Retrieve all transformed assets for a specific asset code."
+    description="Retrieve transformed assets for a specific asset code, one page at a time."
 )
-async def get_transformed_assets(asset_code: str, db=Depends(get_database)):
-    """Get all transformed assets for a specific asset code"""
+async def get_transformed_assets(
+    asset_code: str,
+    skip: int = Query(0, ge=0, description="Number of assets to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of assets to return"),
+    include_content: bool = Query(False, description="Include the content and original_content fields"),
+    db=Depends(get_database)
+):
+    """Get a page of transformed assets for a specific asset code"""
     try:
-        logger.info(f"Fetching transformed assets for asset code: {asset_code}")
-        
-        # Find all transformed assets for the given asset code
-        assets_cursor = db["transformed-assets"].find({"assetCode": asset_code})
-        assets = await assets_cursor.to_list(length=None)
-        
-        # Convert MongoDB ObjectIds to strings
+        logger.info("Fetching transformed assets for asset code: %s", asset_code)
+        
+        # Find the transformed assets for the given asset code
+        query = {"assetCode": asset_code}
+        assets_cursor = db["transformed-assets"].find(
+            query,
+            None if include_content else _LIST_PROJECTION
+        ).sort("_id", 1).skip(skip).limit(limit)
+        assets = await assets_cursor.to_list(length=limit)
+        total = await db["transformed-assets"].count_documents(query)
+        
+        # ObjectIds and datetimes are rendered by the response class
         for asset in assets:
-            asset["id"] = str(asset["_id"])
-            del asset["_id"]
-            if "created_at" in asset and hasattr(asset["created_at"], 'isoformat'):
-                asset["created_at"] = asset["created_at"].isoformat()
+            asset["id"] = str(asset.pop("_id"))
         
-        logger.info(f"Found {len(assets)} transformed assets for asset code: {asset_code}")
-        return {
+        logger.info("Found %s transformed assets for asset code: %s", len(assets), asset_code)
+        return MongoJSONResponse({
             "assetCode": asset_code,
             "count": len(assets),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
             "assets": assets
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error fetching transformed assets: {str(e)}")
@@ -474,35 +575,38 @@ async def get_transformed_assets(asset_code: str, db=Depends(get_database)):
 @router.get(
     "/assets-collection",
     summary="Get All Assets from Assets Collection",
-    description="Retrieve all assets from the assets collection."
+    description="Retrieve assets from the assets collection, one page at a time."
 )
-async def get_all_assets(db=Depends(get_database)):
-    """Get all assets from assets collection"""
+async def get_all_assets(
+    skip: int = Query(0, ge=0, description="Number of assets to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of assets to return"),
+    include_content: bool = Query(False, description="Include the content and original_content fields"),
+    db=Depends(get_database)
+):
+    """Get a page of assets from assets collection"""
     try:
         logger.info("Fetching all assets from assets collection")
         
-        # Find all assets
-        assets_cursor = db["assets"].find({})
-        assets = await assets_cursor.to_list(length=None)
+        # Find a page of assets
+        assets_cursor = db["assets"].find(
+            {},
+            None if include_content else _LIST_PROJECTION
+        ).sort("_id", 1).skip(skip).limit(limit)
+        assets = await assets_cursor.to_list(length=limit)
+        total = await db["assets"].estimated_document_count()
         
-        # Convert MongoDB ObjectIds to strings and handle all fields properly
+        # ObjectIds and datetimes are rendered by the response class
         for asset in assets:
-            if "_id" in asset:
-                asset["id"] = str(asset["_id"])
-                del asset["_id"]
-            if "created_at" in asset and hasattr(asset["created_at"], 'isoformat'):
-                asset["created_at"] = asset["created_at"].isoformat()
-            
-            # Convert any ObjectId fields to strings
-            for key, value in list(asset.items()):
-                if hasattr(value, 'generation_time'):  # Check if it's an ObjectId
-                    asset[key] = str(value)
+            asset["id"] = str(asset.pop("_id"))
         
-        logger.info(f"Found {len(assets)} total assets")
-        return {
+        logger.info("Found %s total assets", len(assets))
+        return MongoJSONResponse({
             "count": len(assets),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
             "assets": assets
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error fetching all assets: {str(e)}")
@@ -514,29 +618,38 @@ async def get_all_assets(db=Depends(get_database)):
 @router.get(
     "/assets",
     summary="Get All Transformed Assets",
-    description="Retrieve all transformed assets from the database."
+    description="Retrieve transformed assets from the database, one page at a time."
 )
-async def get_all_transformed_assets(db=Depends(get_database)):
-    """Get all transformed assets"""
+async def get_all_transformed_assets(
+    skip: int = Query(0, ge=0, description="Number of assets to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of assets to return"),
+    include_content: bool = Query(False, description="Include the content and original_content fields"),
+    db=Depends(get_database)
+):
+    """Get a page of transformed assets"""
     try:
         logger.info("Fetching all transformed assets")
         
-        # Find all transformed assets
-        assets_cursor = db["transformed-assets"].find({})
-        assets = await assets_cursor.to_list(length=None)
+        # Find a page of transformed assets
+        assets_cursor = db["transformed-assets"].find(
+            {},
+            None if include_content else _LIST_PROJECTION
+        ).sort("_id", 1).skip(skip).limit(limit)
+        assets = await assets_cursor.to_list(length=limit)
+        total = await db["transformed-assets"].estimated_document_count()
         
-        # Convert MongoDB ObjectIds to strings
+        # ObjectIds and datetimes are rendered by the response class
         for asset in assets:
-            asset["id"] = str(asset["_id"])
-            del asset["_id"]
-            if "created_at" in asset and hasattr(asset["created_at"], 'isoformat'):
-                asset["created_at"] = asset["created_at"].isoformat()
+            asset["id"] = str(asset.pop("_id"))
         
-        logger.info(f"Found {len(assets)} total transformed assets")
-        return {
+        logger.info("Found %s total transformed assets", len(assets))
+        return MongoJSONResponse({
             "count": len(assets),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
             "assets": assets
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error fetching all transformed assets: {str(e)}")
@@ -556,6 +669,8 @@ async def get_asset(
     domain: str,
     hobby: str,
     style: str,
+    background_tasks: BackgroundTasks,
+    sync: bool = Query(False, description="Wait for a missing style to be generated instead of returning the original"),
     db=Depends(get_database)
 ):
     """
@@ -567,215 +682,118 @@ async def get_asset(
     - **style**: Transformation style (visual_cue, storytelling, summary)
     
     Returns the matching asset or automatically returns the original style record for the given asset code.
+    A missing style is generated from the original after responding, or before responding when **sync** is true.
     """
     try:
-        from bson import ObjectId
-        
-        logger.info(f"Searching for asset: code={code}, domain={domain}, hobby={hobby}, style={style}")
+        logger.info("Searching for asset: code=%s, domain=%s, hobby=%s, style=%s", code, domain, hobby, style)
         
         # Try to convert code to ObjectId for search
         search_conditions = []
         
         # Add both ObjectId and string versions of the code to search
-        try:
-            code_as_objectid = ObjectId(code)
-            search_conditions.extend([
-                {"code": code_as_objectid},
-                {"code": code}
-            ])
-        except Exception:
-            # If not a valid ObjectId, search as string only
-            search_conditions.append({"code": code})
-        
-        # First, try to find exact match with domain, hobby, and style
-        for search_condition in search_conditions:
-            exact_match = await db["assets"].find_one({
-                **search_condition,
-                "domain": domain,
-                "hobby": hobby,
-                "style": style
-            })
+        code_as_objectid = _maybe_oid(code)
+        if code_as_objectid is not code:
+            search_conditions.append({"code": code_as_objectid})
+        search_conditions.append({"code": code})
+        
+        # Fetch the exact match and the original-style fallback in one round-trip
+        pipeline = [
+            {"$match": {"$or": search_conditions}},
+            {"$facet": {
+                "exact": [
+                    {"$match": {"domain": domain, "hobby": hobby, "style": style}},
+                    {"$limit": 1}
+                ],
+                "fallback": [
+                    {"$match": {"style": "original"}},
+                    {"$limit": 1}
+                ]
+            }}
+        ]
+        matches = await _find_asset_matches(db, (code, domain, hobby, style), pipeline)
+        
+        exact_matches = matches.get("exact")
+        if exact_matches:
+            exact_match = exact_matches[0]
+            logger.info("Found exact match for code=%s, style=%s", code, style)
+            # Expose _id as id; MongoJSONResponse encodes the ObjectId and datetime fields
+            exact_match["id"] = exact_match.pop("_id")
             
-            if exact_match:
-                logger.info(f"Found exact match for code={code}, style={style}")
-                # Convert ObjectId fields to strings for JSON response
-                exact_match["id"] = str(exact_match["_id"])
-                del exact_match["_id"]
-                if "code" in exact_match and hasattr(exact_match["code"], 'generation_time'):
-                    exact_match["code"] = str(exact_match["code"])
-                if "created_at" in exact_match and hasattr(exact_match["created_at"], 'isoformat'):
-                    exact_match["created_at"] = exact_match["created_at"].isoformat()
-                
-                return {
-                    "found": True,
-                    "match_type": "exact",
-                    "asset": exact_match
-                }
+            return MongoJSONResponse({
+                "found": True,
+                "match_type": "exact",
+                "asset": exact_match
+            })
         
         # If no exact match found, always try to find original style record for the given asset code
-        logger.info(f"No exact match found, searching for original style: code={code}, style=original")
+        logger.info("No exact match found, searching for original style: code=%s, style=original", code)
         
-        for search_condition in search_conditions:
-            fallback_match = await db["assets"].find_one({
-                **search_condition,
-                "style": "original"
-            })
+        fallback_matches = matches.get("fallback")
+        if fallback_matches:
+            fallback_match = fallback_matches[0]
+            logger.info("Found original style record for code=%s", code)
             
-            if fallback_match:
-                logger.info(f"Found original style record for code={code}")
+            # If the requested style is 'original', return the original content
+            if style == "original":
+                # Expose _id as id; MongoJSONResponse encodes the ObjectId and datetime fields
+                fallback_match["id"] = fallback_match.pop("_id")
                 
-                # If the requested style is 'original', return the original content
-                if style == "original":
-                    # Convert ObjectId fields to strings for JSON response
-                    fallback_match["id"] = str(fallback_match["_id"])
-                    del fallback_match["_id"]
-                    if "code" in fallback_match and hasattr(fallback_match["code"], 'generation_time'):
-                        fallback_match["code"] = str(fallback_match["code"])
-                    if "created_at" in fallback_match and hasattr(fallback_match["created_at"], 'isoformat'):
-                        fallback_match["created_at"] = fallback_match["created_at"].isoformat()
-                    
-                    return {
-                        "found": True,
-                        "match_type": "default_original",
-                        "asset": fallback_match,
-                        "note": f"Original style found for asset code '{code}'."
-                    }
+                return MongoJSONResponse({
+                    "found": True,
+                    "match_type": "default_original",
+                    "asset": fallback_match,
+                    "note": f"Original style found for asset code '{code}'."
+                })
+            
+            # If we have original content but need a different style, generate new content
+            try:
+                # Use original content to generate new style
+                original_content = fallback_match.get("content", "")
                 
-                # If we have original content but need a different style, generate new content
-                try:
-                    logger.info(f"Generating new {style} content for code={code} using original content")
-                    
-                    # Use original content to generate new style
-                    original_content = fallback_match.get("content", "")
-                    
-                    if not original_content:
-                        raise ValueError("Original content is empty")
-                    
-                    # Generate new content using AI
-                    if style == "original":
-                        output = original_content
-                    else:
-                        # Style-specific prompts
-                        style_prompts = {
-                            "storytelling": """
-### Storytelling Mode:
-- Convert the given content into a short storytelling analogy.
-- Make it relevant to the given domain and hobby.
-- Use simple, engaging language.
-- Create a narrative that helps explain the concept.
-""",
-                            "visual_cue": """
-### Visual Cue Mode - Visual Instructions:
-- Create text-based visual cues that explain the content.
-- Use emojis, arrows (➡️), and symbolic representations.
-- Provide 3-4 different visual cue formats.
-- Make it hobby and domain relevant.
-- Focus on visual learning through text symbols.
-""",
-                            "summary": """
-### Summary Mode:
-- Generate a concise summary of the content.
-- Make it clear, informative, and easy to understand.
-- Use analogies from the hobby to explain domain concepts.
-"""
-                        }
-                        
-                        # Create domain-specific context
-                        domain_contexts = {
-                            "engineering-student": "Use examples in circuits, code snippets, algorithms, and technical implementations",
-                            "medical-student": "Use case studies in healthcare, patient scenarios, medical procedures, and clinical examples", 
-                            "business-student": "Use marketing examples, finance scenarios, business strategies, and corporate case studies",
-                            "teacher-trainer": "Use classroom storytelling, pedagogy techniques, educational methods, and teaching scenarios",
-                            "working-professional": "Use real-world workplace analogies, professional scenarios, industry examples, and practical applications"
-                        }
-                        
-                        domain_context = domain_contexts.get(domain, f"Use examples relevant to {domain}")
-                        
-                        # Create the AI prompt
-                        prompt = f"""You are an AI content transformer. 
-You will receive inputs for content transformation based on specific learner profiles.
-
-Domain Context: {domain_context}
-Hobby Context: Connect concepts to {hobby} for better relatability
-
-Your task is to generate content in the specified style:
-
-{style_prompts[style]}
-
-Now transform this content for {domain} who loves {hobby}:
-
-**Style:** {style}
-**Content:** "{original_content}"
-**Domain:** {domain} - {domain_context}
-**Hobby:** {hobby}
-
-Please provide ONLY the {style} output without any formatting or labels:"""
-
-                        # Generate response using Google Generative AI
-                        response = model.generate_content(prompt)
-                        
-                        if not response.text:
-                            raise ValueError("AI failed to generate content")
-                        
-                        output = response.text.strip()
-                        
-                        # Clean up any unwanted formatting
-                        if output.startswith('"') and output.endswith('"'):
-                            output = output[1:-1]
-                    
-                    # Insert the new generated content into assets collection
-                    try:
-                        code_as_objectid = ObjectId(code)
-                    except Exception:
-                        code_as_objectid = code
-                        
-                    new_asset_data = {
-                        "code": code_as_objectid,
-                        "content": output,
-                        "style": style,
-                        "domain": domain,
-                        "hobby": hobby,
-                        "created_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow(),
-                        "status": "not-started"
-                    }
-                    
-                    result = await db["assets"].insert_one(new_asset_data)
-                    new_asset_data["id"] = str(result.inserted_id)
-                    new_asset_data["code"] = str(new_asset_data["code"])
-                    if "created_at" in new_asset_data and hasattr(new_asset_data["created_at"], 'isoformat'):
-                        new_asset_data["created_at"] = new_asset_data["created_at"].isoformat()
-                    if "updated_at" in new_asset_data and hasattr(new_asset_data["updated_at"], 'isoformat'):
-                        new_asset_data["updated_at"] = new_asset_data["updated_at"].isoformat()
-                    
-                    logger.info(f"Successfully generated and inserted new {style} content for code={code}")
-                    
-                    return {
-                        "found": True,
-                        "match_type": "generated",
-                        "asset": new_asset_data,
-                        "note": f"Generated new {style} content for asset code '{code}' using original content and inserted into database."
-                    }
-                    
-                except Exception as gen_error:
-                    logger.error(f"Failed to generate content: {str(gen_error)}")
-                    # If generation fails, return original as fallback
-                    fallback_match["id"] = str(fallback_match["_id"])
-                    del fallback_match["_id"]
-                    if "code" in fallback_match and hasattr(fallback_match["code"], 'generation_time'):
-                        fallback_match["code"] = str(fallback_match["code"])
-                    if "created_at" in fallback_match and hasattr(fallback_match["created_at"], 'isoformat'):
-                        fallback_match["created_at"] = fallback_match["created_at"].isoformat()
+                if not original_content:
+                    raise ValueError("Original content is empty")
+                
+                lookup_key = (code, domain, hobby, style)
+                if not sync:
+                    # Serve the original now and generate the requested style after responding;
+                    # later requests pick up the stored variant
+                    if lookup_key not in _pending_generations:
+                        _pending_generations.add(lookup_key)
+                        background_tasks.add_task(
+                            _generate_variant_in_background, db, lookup_key, code_as_objectid, original_content
+                        )
+                    fallback_match["id"] = fallback_match.pop("_id")
                     
-                    return {
+                    return MongoJSONResponse({
                         "found": True,
-                        "match_type": "fallback_original",
+                        "match_type": "fallback_pending_generation",
                         "asset": fallback_match,
-                        "note": f"Content generation failed, returning original style for asset code '{code}'. Error: {str(gen_error)}"
-                    }
+                        "note": f"Generating {style} content for asset code '{code}' in the background; returning the original style until it is ready."
+                    })
+                
+                new_asset_data = await _generate_variant(db, lookup_key, code_as_objectid, original_content)
+                
+                return MongoJSONResponse({
+                    "found": True,
+                    "match_type": "generated",
+                    "asset": new_asset_data,
+                    "note": f"Generated new {style} content for asset code '{code}' using original content and inserted into database."
+                })
+                
+            except Exception as gen_error:
+                logger.error(f"Failed to generate content: {str(gen_error)}")
+                # If generation fails, return original as fallback
+                fallback_match["id"] = fallback_match.pop("_id")
+                
+                return MongoJSONResponse({
+                    "found": True,
+                    "match_type": "fallback_original",
+                    "asset": fallback_match,
+                    "note": f"Content generation failed, returning original style for asset code '{code}'. Error: {str(gen_error)}"
+                })
         
         # No match found at all (neither specific combination nor original style)
-        logger.info(f"No asset found for code={code} (neither specific combination nor original style)")
+        logger.info("No asset found for code=%s (neither specific combination nor original style)", code)
         return {
             "found": False,
             "match_type": "none",
@@ -815,21 +833,14 @@ async def update_asset(
     Updates or creates a record in the userassetstatus collection for the specific user, course, and asset combination.
     """
     try:
-        from bson import ObjectId
-        from datetime import datetime
-        from app.schemas.user_asset_status import AssetStatus
-
         # Validate status values
-        try:
-            status_enum = AssetStatus(asset_status)
-        except ValueError:
-            valid_statuses = [s.value for s in AssetStatus]
+        if asset_status not in _VALID_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status '{asset_status}'. Valid statuses are: {', '.join(valid_statuses)}"
+                detail=f"Invalid status '{asset_status}'. Valid statuses are: {', '.join(s.value for s in AssetStatus)}"
             )
 
-        logger.info(f"Updating user asset status: course={course}, asset={asset}, user={user}, status={asset_status}")
+        logger.info("Updating user asset status: course=%s, asset=%s, user=%s, status=%s", course, asset, user, asset_status)
 
         # Create the search condition
         search_condition = {
@@ -839,99 +850,49 @@ async def update_asset(
         }
 
         # Prepare update data
+        now = datetime.now(_UTC)
         update_data = {
             "status": asset_status,
-            "updated_at": datetime.utcnow(),
-            "last_accessed": datetime.utcnow()
+            "updated_at": now,
+            "last_accessed": now
         }
+        insert_data = {"created_at": now}
 
-        # Add progress if provided
+        # Add progress if provided; new records otherwise start at 0
         if progress is not None:
             update_data["progress"] = progress
+        else:
+            insert_data["progress"] = 0
 
-        # Try to update existing record first
-        update_result = await db["userassetstatus"].update_one(
+        # Update the record, or create it when missing, and read it back in one round trip
+        record = await db["userassetstatus"].find_one_and_update(
             search_condition,
-            {"$set": update_data}
+            {"$set": update_data, "$setOnInsert": insert_data},
+            projection=_STATUS_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
 
-        if update_result.matched_count > 0:
-            # Record was updated
-            logger.info(f"Updated existing user asset status record")
-            
-            # Get the updated record
-            updated_record = await db["userassetstatus"].find_one(search_condition)
-            
-            if updated_record:
-                # Convert ObjectId to string for JSON response
-                updated_record["id"] = str(updated_record["_id"])
-                del updated_record["_id"]
-                
-                # Convert any other ObjectId fields to strings
-                for key, value in list(updated_record.items()):
-                    if hasattr(value, 'generation_time'):  # Check if it's an ObjectId
-                        updated_record[key] = str(value)
-                
-                # Convert datetime fields to ISO format
-                for field in ["created_at", "updated_at", "last_accessed"]:
-                    if field in updated_record and hasattr(updated_record[field], 'isoformat'):
-                        updated_record[field] = updated_record[field].isoformat()
-
-                return {
-                    "success": True,
-                    "action": "updated",
-                    "message": f"Successfully updated user asset status",
-                    "course": course,
-                    "asset": asset,
-                    "user": user,
-                    "newStatus": asset_status,
-                    "progress": progress,
-                    "record": updated_record,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-        else:
-            # No existing record found, create a new one
-            logger.info(f"Creating new user asset status record")
-            
-            new_record_data = {
-                **search_condition,
-                **update_data,
-                "created_at": datetime.utcnow(),
-                "progress": progress if progress is not None else 0
-            }
-
-            insert_result = await db["userassetstatus"].insert_one(new_record_data)
-            
-            if insert_result.inserted_id:
-                new_record_data["id"] = str(insert_result.inserted_id)
-                
-                # Convert any ObjectId fields to strings
-                for key, value in list(new_record_data.items()):
-                    if hasattr(value, 'generation_time'):  # Check if it's an ObjectId
-                        new_record_data[key] = str(value)
-                
-                # Convert datetime fields to ISO format
-                for field in ["created_at", "updated_at", "last_accessed"]:
-                    if field in new_record_data and hasattr(new_record_data[field], 'isoformat'):
-                        new_record_data[field] = new_record_data[field].isoformat()
-
-                return {
-                    "success": True,
-                    "action": "created",
-                    "message": f"Successfully created new user asset status record",
-                    "course": course,
-                    "asset": asset,
-                    "user": user,
-                    "newStatus": asset_status,
-                    "progress": progress,
-                    "record": new_record_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to create user asset status record"
-                )
+        # created_at is only written on insert, so it matches updated_at for new records
+        created = record.get("created_at") == record["updated_at"]
+        action = "created" if created else "updated"
+        logger.info("%s user asset status record", "Created new" if created else "Updated existing")
+
+        # Expose _id as id; MongoJSONResponse encodes the ObjectId and datetime fields
+        record["id"] = record.pop("_id")
+
+        return MongoJSONResponse({
+            "success": True,
+            "action": action,
+            "message": "Successfully created new user asset status record" if created else "Successfully updated user asset status",
+            "course": course,
+            "asset": asset,
+            "user": user,
+            "newStatus": asset_status,
+            "progress": progress,
+            "record": record,
+            "timestamp": now
+        })
 
     except HTTPException:
         raise
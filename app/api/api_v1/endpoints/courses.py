@@ -1,38 +1,50 @@
+import re
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
+from app.core import course_cache
 from app.core.mongodb import get_database
 from app.schemas.course import Course, CourseCreate, CourseUpdate, CourseWithAssets, CourseWithUserProgress, Asset, AssetCreate
 from app.services.course_service import CourseService
 from app.api.api_v1.endpoints.auth import get_current_user
+from app.api.api_v1.endpoints.quiz import get_quiz_service
 from app.models.user import User as UserModel
 
 router = APIRouter()
 
+_OID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+_MAX_BULK_ASSETS = 500
+
+
+def _validate_oid(value: str, detail: str) -> None:
+    """Reject IDs that are not 24-character hex ObjectId strings."""
+    if not _OID_RE.match(value):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def get_course_service(request: Request) -> CourseService:
+    """Return the CourseService shared by all course requests, creating it on first use."""
+    service = getattr(request.app.state, "course_service", None)
+    if service is None:
+        service = CourseService(get_database())
+        request.app.state.course_service = service
+    return service
+
 
 @router.get("/{course_id}/assets", response_model=CourseWithAssets)
 async def get_course_assets(
     course_id: str,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get course with populated assets.
     Returns the course with all modules and their associated assets.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(course_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(course_id, "Invalid course ID format")
     
-    course = await course_service.get_course_with_assets(course_id)
+    course = await course_cache.get_or_load(("course_assets", course_id), lambda: course_service.get_course_with_assets(course_id))
     
     if not course:
         raise HTTPException(
@@ -46,23 +58,15 @@ async def get_course_assets(
 @router.get("/{course_id}/assets/progress", response_model=CourseWithUserProgress)
 async def get_course_assets_with_progress(
     course_id: str,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get course with populated assets and user progress.
     Returns the course with all modules, their associated assets, and user progress status.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(course_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(course_id, "Invalid course ID format")
     
     # Use current user's ID for progress tracking
     user_id = str(current_user.id)
@@ -81,39 +85,29 @@ async def get_course_assets_with_progress(
 async def get_courses(
     skip: int = 0,
     limit: int = 100,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get list of courses with pagination.
     """
-    db = get_database()
-    course_service = CourseService(db)
-    
-    courses = await course_service.get_courses(skip=skip, limit=limit)
+    courses = await course_cache.get_or_load(("courses", skip, limit), lambda: course_service.get_courses(skip=skip, limit=limit))
     return courses
 
 
 @router.get("/{course_id}", response_model=Course)
 async def get_course(
     course_id: str,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get a specific course by ID.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(course_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(course_id, "Invalid course ID format")
     
-    course = await course_service.get_course(course_id)
+    course = await course_cache.get_or_load(("course", course_id), lambda: course_service.get_course(course_id))
     
     if not course:
         raise HTTPException(
@@ -127,16 +121,15 @@ async def get_course(
 @router.post("/", response_model=Course)
 async def create_course(
     course: CourseCreate,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Create a new course.
     """
-    db = get_database()
-    course_service = CourseService(db)
-    
     try:
         new_course = await course_service.create_course(course)
+        course_cache.invalidate()
         return new_course
     except Exception as e:
         raise HTTPException(
@@ -149,24 +142,18 @@ async def create_course(
 async def update_course(
     course_id: str,
     course_update: CourseUpdate,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Update a course.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(course_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(course_id, "Invalid course ID format")
     
     updated_course = await course_service.update_course(course_id, course_update)
+    course_cache.invalidate()
+    get_quiz_service().invalidate_course_modules(course_id)
     
     if not updated_course:
         raise HTTPException(
@@ -180,24 +167,18 @@ async def update_course(
 @router.delete("/{course_id}")
 async def delete_course(
     course_id: str,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Delete a course.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(course_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(course_id, "Invalid course ID format")
     
     success = await course_service.delete_course(course_id)
+    course_cache.invalidate()
+    get_quiz_service().invalidate_course_modules(course_id)
     
     if not success:
         raise HTTPException(
@@ -213,39 +194,29 @@ async def delete_course(
 async def get_assets(
     skip: int = 0,
     limit: int = 100,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get list of assets with pagination.
     """
-    db = get_database()
-    course_service = CourseService(db)
-    
-    assets = await course_service.get_assets(skip=skip, limit=limit)
+    assets = await course_cache.get_or_load(("assets", skip, limit), lambda: course_service.get_assets(skip=skip, limit=limit))
     return assets
 
 
 @router.get("/assets/{asset_id}", response_model=Asset)
 async def get_asset(
     asset_id: str,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Get a specific asset by ID.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(asset_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid asset ID format"
-        )
-    
-    db = get_database()
-    course_service = CourseService(db)
+    # Validate ObjectId format
+    _validate_oid(asset_id, "Invalid asset ID format")
     
-    asset = await course_service.get_asset(asset_id)
+    asset = await course_cache.get_or_load(("asset", asset_id), lambda: course_service.get_asset(asset_id))
     
     if not asset:
         raise HTTPException(
@@ -259,16 +230,15 @@ async def get_asset(
 @router.post("/assets/", response_model=Asset)
 async def create_asset(
     asset: AssetCreate,
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Create a new asset.
     """
-    db = get_database()
-    course_service = CourseService(db)
-    
     try:
         new_asset = await course_service.create_asset(asset)
+        course_cache.invalidate()
         return new_asset
     except Exception as e:
         raise HTTPException(
@@ -277,27 +247,48 @@ async def create_asset(
         )
 
 
-@router.delete("/assets/{asset_id}")
-async def delete_asset(
-    asset_id: str,
+@router.post("/assets/bulk", response_model=List[Asset])
+async def create_assets_bulk(
+    assets: List[AssetCreate],
+    course_service: CourseService = Depends(get_course_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
-    Delete an asset.
+    Create several assets in one database round trip.
     """
-    try:
-        # Validate ObjectId format
-        ObjectId(asset_id)
-    except Exception:
+    if not assets or len(assets) > _MAX_BULK_ASSETS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid asset ID format"
+            detail=f"Between 1 and {_MAX_BULK_ASSETS} assets are required"
         )
     
-    db = get_database()
-    course_service = CourseService(db)
+    try:
+        new_assets = await course_service.create_assets_bulk(assets)
+        return new_assets
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create assets: {str(e)}"
+        )
+    finally:
+        # An unordered insert can fail part-way, so drop cached reads either way
+        course_cache.invalidate()
+
+
+@router.delete("/assets/{asset_id}")
+async def delete_asset(
+    asset_id: str,
+    course_service: CourseService = Depends(get_course_service),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Delete an asset.
+    """
+    # Validate ObjectId format
+    _validate_oid(asset_id, "Invalid asset ID format")
     
     success = await course_service.delete_asset(asset_id)
+    course_cache.invalidate()
     
     if not success:
         raise HTTPException(
@@ -12,7 +12,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[Item])
-async def read_items(
+def read_items(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -25,7 +25,7 @@ async def read_items(
 
 
 @router.post("/", response_model=Item)
-async def create_item(
+def create_item(
     item: ItemCreate,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
@@ -36,7 +36,7 @@ async def create_item(
 
 
 @router.get("/{item_id}", response_model=Item)
-async def read_item(
+def read_item(
     item_id: int,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
@@ -62,7 +62,7 @@ async def read_item(
 
 
 @router.put("/{item_id}", response_model=Item)
-async def update_item(
+def update_item(
     item_id: int,
     item_update: ItemUpdate,
     db: Session = Depends(get_db),
@@ -90,7 +90,7 @@ async def update_item(
 
 
 @router.delete("/{item_id}")
-async def delete_item(
+def delete_item(
     item_id: int,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -31,7 +32,8 @@ def read_learning_resources(
     """
     Retrieve all learning resources with pagination
     """
-    resources = db.query(LearningResource).offset(skip).limit(limit).all()
+    stmt = select(LearningResource).order_by(LearningResource.id).offset(skip).limit(limit)
+    resources = db.scalars(stmt).all()
     return resources
 
 @router.get("/learning-resources/{resource_id}", response_model=LearningResourceSchema)
@@ -42,7 +44,7 @@ def read_learning_resource(
     """
     Get a specific learning resource by ID
     """
-    db_resource = db.query(LearningResource).filter(LearningResource.id == resource_id).first()
+    db_resource = db.get(LearningResource, resource_id)
     if db_resource is None:
         raise HTTPException(status_code=404, detail="Learning resource not found")
     return db_resource
@@ -56,7 +58,7 @@ def update_learning_resource(
     """
     Update a learning resource
     """
-    db_resource = db.query(LearningResource).filter(LearningResource.id == resource_id).first()
+    db_resource = db.get(LearningResource, resource_id)
     if db_resource is None:
         raise HTTPException(status_code=404, detail="Learning resource not found")
     
@@ -75,7 +77,7 @@ def delete_learning_resource(
     """
     Delete a learning resource
     """
-    db_resource = db.query(LearningResource).filter(LearningResource.id == resource_id).first()
+    db_resource = db.get(LearningResource, resource_id)
     if db_resource is None:
         raise HTTPException(status_code=404, detail="Learning resource not found")
     
@@ -2,9 +2,22 @@
 LLM API endpoints for content generation.
 """
 
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from pydantic import BaseModel, Field
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Optional, Set
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.core import llm_cache
+from app.core.config import settings
+from app.core.mongodb import get_database
+from app.utils.singleflight import SingleFlight
 
 from app.services.llm_service import (
     LLMRequest, 
@@ -20,46 +33,209 @@ from app.services.llm_service import (
 #from app.api.deps import get_current_user
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_custom_inflight = SingleFlight()
+
+# Background generation jobs are recorded in Mongo so any worker can answer /jobs/{job_id}
+# and a finished job survives a restart; the TTL index on created_at expires them.
+# The running tasks are referenced here only so they are not garbage collected.
+_JOBS_COLLECTION = "llm_jobs"
+_job_tasks: Set[asyncio.Task] = set()
+
+
+def _cache_key(endpoint: str, content: str, *params: Any) -> str:
+    """Build a response cache key; content is hashed unchanged, since case can matter (code, acronyms, names)."""
+    return llm_cache.make_key("llm", endpoint, content, *(str(param) for param in params))
+
+
+def _is_cacheable(payload: str) -> bool:
+    """Leave results the service could not parse (e.g. malformed quiz JSON) uncached so the next request retries."""
+    result = orjson.loads(payload)["result"]
+    return not (isinstance(result, dict) and "error" in result)
+
+
+async def _generate_json(
+    generate: Callable[[], Awaitable[LLMResponse]],
+    action: str
+) -> str:
+    """Call the LLM and return the serialized LLMResponse, answering 502 when the provider reports a failure."""
+    response = await generate()
+    if not response.success:
+        raise HTTPException(
+            status_code=502,
+            detail=f"{action} failed: {response.error_message}"
+        )
+    return response.model_dump_json()
+
+
+async def _load_cached(
+    key: str,
+    generate: Callable[[], Awaitable[LLMResponse]],
+    action: str
+) -> str:
+    """Return the serialized LLMResponse for ``key`` from the LLM response cache, calling the LLM only on a miss."""
+    return await llm_cache.get_or_set(key, lambda: _generate_json(generate, action), should_cache=_is_cacheable)
+
+
+async def _generate_cached(
+    key: str,
+    generate: Callable[[], Awaitable[LLMResponse]],
+    action: str
+) -> Response:
+    """
+    Serve a generation from the LLM response cache, calling the LLM only on a miss.
+    Responses are cached as serialized JSON and returned as-is, skipping re-validation.
+    """
+    payload = await _load_cached(key, generate, action)
+    return Response(content=payload, media_type="application/json")
+
+
+async def _run_job(
+    db: AsyncIOMotorDatabase,
+    job_id: str,
+    key: str,
+    generate: Callable[[], Awaitable[LLMResponse]],
+    action: str
+):
+    """Run a generation job and record its result or error for /jobs/{job_id}."""
+    try:
+        payload = await _load_cached(key, generate, action)
+        update = {"status": "completed", "result": orjson.loads(payload)}
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Background job {job_id} failed: {detail}")
+        update = {"status": "failed", "error": detail}
+    try:
+        await db[_JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": update})
+    except Exception as e:
+        logger.error(f"Failed to record background job {job_id}: {e}")
+
+
+async def _start_job(
+    db: AsyncIOMotorDatabase,
+    key: str,
+    generate: Callable[[], Awaitable[LLMResponse]],
+    action: str
+) -> ORJSONResponse:
+    """Record a pending job, start the generation in the background and answer 202 with a handle to poll."""
+    job_id = uuid.uuid4().hex
+    await db[_JOBS_COLLECTION].insert_one({
+        "_id": job_id,
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc)
+    })
+    task = asyncio.create_task(_run_job(db, job_id, key, generate, action))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    job = GenerationJob(
+        job_id=job_id,
+        status="pending",
+        status_url=f"{settings.api_v1_prefix}/llm/jobs/{job_id}"
+    )
+    return ORJSONResponse(job.model_dump(), status_code=status.HTTP_202_ACCEPTED)
+
+
+async def _stream_generation(key: Optional[str], llm_request: LLMRequest) -> AsyncIterator[str]:
+    """
+    Yield SSE events with text deltas as they are generated, then a final event with the parsed result.
+    A cached response is sent as the final event straight away; a fresh one is cached once complete.
+    Without a ``key`` the cache is bypassed.
+    """
+    try:
+        cached = llm_cache.get(key) if key is not None else None
+        if cached:
+            yield f"data: {orjson.dumps({'done': True, 'result': orjson.loads(cached)['result']}).decode()}\n\n"
+            return
+        
+        parts = []
+        async for delta in llm_service.generate_content_stream(llm_request):
+            parts.append(delta)
+            yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
+        
+        response = LLMResponse(
+            success=True,
+            result=llm_service.parse_text("".join(parts), llm_request.result_type),
+            result_type=llm_request.result_type,
+            provider=llm_request.provider
+        )
+        payload = response.model_dump_json()
+        if key is not None and _is_cacheable(payload):
+            llm_cache.put(key, payload)
+        yield f"data: {orjson.dumps({'done': True, 'result': response.result}).decode()}\n\n"
+    except Exception as e:
+        logger.error(f"Error streaming content generation: {str(e)}")
+        yield f"data: {orjson.dumps({'done': True, 'error': str(e)}).decode()}\n\n"
+
+
+# Request bodies are read-only once validated; unknown fields are rejected up front
+_REQUEST_MODEL_CONFIG = ConfigDict(
+    extra="forbid",
+    frozen=True,
+    str_strip_whitespace=True,
+    validate_assignment=False
+)
+
 
 class GenerateContentRequest(BaseModel):
     """Request model for content generation endpoint."""
+    model_config = _REQUEST_MODEL_CONFIG
+
     content: str = Field(description="The input content/description to process")
     result_type: ResultType = Field(description="Type of result to generate")
-    additional_params: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional parameters for generation")
-    provider: Optional[LLMProvider] = LLMProvider.GOOGLE
-    max_tokens: Optional[int] = Field(default=1000, ge=100, le=4000)
-    temperature: Optional[float] = Field(default=0.7, ge=0.0, le=2.0)
+    additional_params: Dict[str, Any] = Field(default_factory=dict, description="Additional parameters for generation")
+    provider: LLMProvider = LLMProvider.GOOGLE
+    max_tokens: int = Field(default=1000, ge=100, le=4000)
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    stream: bool = Field(default=False, description="Stream the generated text as Server-Sent Events")
 
 
 class QuizGenerationRequest(BaseModel):
     """Specific request model for quiz generation."""
+    model_config = _REQUEST_MODEL_CONFIG
+
     content: str = Field(description="Content to create quiz from")
-    num_questions: Optional[int] = Field(default=5, ge=1, le=20)
-    difficulty: Optional[str] = Field(default="medium", pattern="^(easy|medium|hard)$")
-    num_options: Optional[int] = Field(default=4, ge=2, le=6)
+    num_questions: int = Field(default=5, ge=1, le=20)
+    difficulty: str = Field(default="medium", pattern="^(easy|medium|hard)$")
+    num_options: int = Field(default=4, ge=2, le=6)
 
 
 class ExplanationRequest(BaseModel):
     """Request model for explanation generation."""
+    model_config = _REQUEST_MODEL_CONFIG
+
     content: str = Field(description="Content to explain")
-    style: Optional[str] = Field(default="clear and engaging")
-    audience: Optional[str] = Field(default="general learners")
+    style: str = Field(default="clear and engaging")
+    audience: str = Field(default="general learners")
 
 
 class StoryRequest(BaseModel):
     """Request model for story generation."""
+    model_config = _REQUEST_MODEL_CONFIG
+
     content: str = Field(description="Concept to explain through story")
-    audience: Optional[str] = Field(default="students")
-    length: Optional[str] = Field(default="medium", pattern="^(short|medium|long)$")
+    audience: str = Field(default="students")
+    length: str = Field(default="medium", pattern="^(short|medium|long)$")
+
+
+class GenerationJob(BaseModel):
+    """Handle for a generation running in the background."""
+    job_id: str
+    status: str  # "pending", "completed" or "failed"
+    status_url: Optional[str] = None
+    result: Optional[LLMResponse] = None
+    error: Optional[str] = None
 
 
 class CustomContentRequest(BaseModel):
     """Request model for custom content generation."""
+    model_config = _REQUEST_MODEL_CONFIG
+
     content: str = Field(description="Input content")
     custom_prompt: str = Field(description="Custom prompt template")
-    additional_instructions: Optional[str] = Field(default="")
+    additional_instructions: str = Field(default="")
 
 
 @router.post("/generate", response_model=LLMResponse)
@@ -71,66 +247,88 @@ async def generate_content(
     Generate content using LLM based on input content and result type.
     
     This is the main endpoint for flexible content generation.
+    With **stream** set, the text is sent as Server-Sent Events: `delta` events while it is
+    generated, then a final event with the parsed `result` or an `error`.
     """
-    try:
-        llm_request = LLMRequest(
-            content=request.content,
-            result_type=request.result_type,
-            additional_params=request.additional_params,
-            provider=request.provider,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature
-        )
-        
-        response = await llm_service.generate_content(llm_request)
-        
-        if not response.success:
+    llm_request = LLMRequest(
+        content=request.content,
+        result_type=request.result_type,
+        additional_params=request.additional_params,
+        provider=request.provider,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature
+    )
+    # An explicitly requested high temperature asks for varied output, so it is never served from the cache
+    use_cache = (
+        "temperature" not in request.model_fields_set
+        or request.temperature <= settings.llm_cache_max_temperature
+    )
+    cache_key = _cache_key(
+        "generate",
+        request.content,
+        request.result_type.value,
+        orjson.dumps(request.additional_params, option=orjson.OPT_SORT_KEYS, default=str).decode(),
+        request.provider.value,
+        request.max_tokens,
+        request.temperature
+    ) if use_cache else None
+    
+    if request.stream:
+        if request.provider != LLMProvider.GOOGLE:
             raise HTTPException(
-                status_code=500,
-                detail=f"Content generation failed: {response.error_message}"
+                status_code=400,
+                detail="Streaming is only supported for the google provider"
             )
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error generating content: {str(e)}"
+        return StreamingResponse(
+            _stream_generation(cache_key, llm_request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
         )
+    
+    if cache_key is None:
+        payload = await _generate_json(lambda: llm_service.generate_content(llm_request), "Content generation")
+        return Response(content=payload, media_type="application/json")
+    
+    return await _generate_cached(
+        cache_key,
+        lambda: llm_service.generate_content(llm_request),
+        "Content generation"
+    )
 
 
-@router.post("/generate/quiz", response_model=LLMResponse)
+@router.post(
+    "/generate/quiz",
+    response_model=LLMResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": GenerationJob}}
+)
 async def generate_quiz_endpoint(
     request: QuizGenerationRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database),
     #current_user: User = Depends(get_current_user)
 ) -> LLMResponse:
     """
     Generate a multiple choice quiz from the provided content.
     
+    Large quizzes (more questions than the configured sync limit) that are not cached yet are
+    generated in the background: the response is 202 with a job handle to poll at /jobs/{job_id}.
+    
     Example usage:
     - Content: "Photosynthesis is the process by which plants convert sunlight into energy..."
     - Result: Structured quiz with multiple choice questions
     """
-    try:
-        response = await generate_quiz(
+    key = _cache_key("quiz", request.content, request.num_questions, request.difficulty)
+    
+    def generate():
+        return generate_quiz(
             content=request.content,
             num_questions=request.num_questions,
             difficulty=request.difficulty
         )
-        
-        if not response.success:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Quiz generation failed: {response.error_message}"
-            )
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error generating quiz: {str(e)}"
-        )
+    
+    if request.num_questions > settings.llm_quiz_sync_max_questions and llm_cache.get(key) is None:
+        return await _start_job(db, key, generate, "Quiz generation")
+    
+    return await _generate_cached(key, generate, "Quiz generation")
 
 
 @router.post("/generate/explanation", response_model=LLMResponse)
@@ -146,26 +344,15 @@ async def generate_explanation_endpoint(
     - Style: "beginner-friendly"
     - Result: Comprehensive explanation tailored to the audience
     """
-    try:
-        response = await generate_explanation(
+    return await _generate_cached(
+        _cache_key("explanation", request.content, request.style, request.audience),
+        lambda: generate_explanation(
             content=request.content,
             style=request.style,
             audience=request.audience
-        )
-        
-        if not response.success:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Explanation generation failed: {response.error_message}"
-            )
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error generating explanation: {str(e)}"
-        )
+        ),
+        "Explanation generation"
+    )
 
 
 @router.post("/generate/story", response_model=LLMResponse)
@@ -181,26 +368,15 @@ async def generate_story_endpoint(
     - Audience: "high school students"
     - Result: Educational story with characters and plot
     """
-    try:
-        response = await generate_story(
+    return await _generate_cached(
+        _cache_key("story", request.content, request.audience, request.length),
+        lambda: generate_story(
             content=request.content,
             audience=request.audience,
             length=request.length
-        )
-        
-        if not response.success:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Story generation failed: {response.error_message}"
-            )
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error generating story: {str(e)}"
-        )
+        ),
+        "Story generation"
+    )
 
 
 @router.post("/generate/custom", response_model=LLMResponse)
@@ -218,97 +394,120 @@ async def generate_custom_content_endpoint(
     - Custom Prompt: "Create a beginner tutorial with examples and exercises"
     - Result: Custom formatted content based on the prompt
     """
-    try:
-        response = await generate_custom_content(
+    # Custom prompts are too open-ended to cache, but identical concurrent requests share one call
+    response = await _custom_inflight.do(
+        llm_cache.make_key("llm", "custom", request.content, request.custom_prompt, request.additional_instructions),
+        lambda: generate_custom_content(
             content=request.content,
             custom_prompt=request.custom_prompt,
             additional_instructions=request.additional_instructions
         )
-        
-        if not response.success:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Custom content generation failed: {response.error_message}"
-            )
-        
-        return response
-        
-    except Exception as e:
+    )
+    
+    if not response.success:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error generating custom content: {str(e)}"
+            status_code=502,
+            detail=f"Custom content generation failed: {response.error_message}"
         )
+    
+    return response
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJob)
+async def get_generation_job(
+    job_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> GenerationJob:
+    """
+    Get the status of a background generation job; once completed it carries the result.
+    Jobs are kept for the configured job TTL after they start.
+    """
+    job = await db[_JOBS_COLLECTION].find_one(
+        {"_id": job_id},
+        {"_id": 0, "status": 1, "result": 1, "error": 1}
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return GenerationJob(job_id=job_id, **job)
+
+
+# Static catalogue served by /result-types, serialized once at import
+_RESULT_TYPES_BODY = orjson.dumps({
+    "result_types": {
+        "quiz_mcq": {
+            "name": "Multiple Choice Quiz",
+            "description": "Generate structured quiz with multiple choice questions",
+            "parameters": ["num_questions", "difficulty", "num_options"]
+        },
+        "explanation": {
+            "name": "Explanation",
+            "description": "Generate clear explanation of concepts",
+            "parameters": ["style", "audience"]
+        },
+        "summary": {
+            "name": "Summary",
+            "description": "Create concise summary of content",
+            "parameters": ["length"]
+        },
+        "story": {
+            "name": "Story",
+            "description": "Create engaging story that explains concepts",
+            "parameters": ["audience", "length"]
+        },
+        "meme_description": {
+            "name": "Meme Description",
+            "description": "Create humorous meme-based explanation",
+            "parameters": []
+        },
+        "analogy": {
+            "name": "Analogy",
+            "description": "Create relatable analogy for complex concepts",
+            "parameters": []
+        },
+        "code_example": {
+            "name": "Code Example",
+            "description": "Generate practical code examples",
+            "parameters": ["language"]
+        },
+        "step_by_step": {
+            "name": "Step-by-Step Guide",
+            "description": "Create detailed step-by-step instructions",
+            "parameters": []
+        },
+        "custom": {
+            "name": "Custom",
+            "description": "Generate content with custom prompt",
+            "parameters": ["custom_prompt", "additional_instructions"]
+        }
+    },
+    "providers": ["google", "openai", "anthropic", "local"],
+    "common_parameters": {
+        "max_tokens": "Maximum tokens for generation (100-4000)",
+        "temperature": "Creativity level (0.0-2.0)",
+        "provider": "LLM provider to use"
+    }
+})
 
 
 @router.get("/result-types")
 async def get_supported_result_types(
     #current_user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get all supported result types and their descriptions.
     """
-    return {
-        "result_types": {
-            "quiz_mcq": {
-                "name": "Multiple Choice Quiz",
-                "description": "Generate structured quiz with multiple choice questions",
-                "parameters": ["num_questions", "difficulty", "num_options"]
-            },
-            "explanation": {
-                "name": "Explanation",
-                "description": "Generate clear explanation of concepts",
-                "parameters": ["style", "audience"]
-            },
-            "summary": {
-                "name": "Summary",
-                "description": "Create concise summary of content",
-                "parameters": ["length"]
-            },
-            "story": {
-                "name": "Story",
-                "description": "Create engaging story that explains concepts",
-                "parameters": ["audience", "length"]
-            },
-            "meme_description": {
-                "name": "Meme Description",
-                "description": "Create humorous meme-based explanation",
-                "parameters": []
-            },
-            "analogy": {
-                "name": "Analogy",
-                "description": "Create relatable analogy for complex concepts",
-                "parameters": []
-            },
-            "code_example": {
-                "name": "Code Example",
-                "description": "Generate practical code examples",
-                "parameters": ["language"]
-            },
-            "step_by_step": {
-                "name": "Step-by-Step Guide",
-                "description": "Create detailed step-by-step instructions",
-                "parameters": []
-            },
-            "custom": {
-                "name": "Custom",
-                "description": "Generate content with custom prompt",
-                "parameters": ["custom_prompt", "additional_instructions"]
-            }
-        },
-        "providers": ["google", "openai", "anthropic", "local"],
-        "common_parameters": {
-            "max_tokens": "Maximum tokens for generation (100-4000)",
-            "temperature": "Creativity level (0.0-2.0)",
-            "provider": "LLM provider to use"
-        }
-    }
+    return Response(content=_RESULT_TYPES_BODY, media_type="application/json")
+
+
+# Health probes hit this constantly; the body never changes
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "llm_service",
+    "version": "1.0.0"
+})
 
 
 @router.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> Response:
     """Health check endpoint for LLM service."""
-    return {
-        "status": "healthy",
-        "service": "llm_service",
-        "version": "1.0.0"
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
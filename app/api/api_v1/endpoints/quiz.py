@@ -2,10 +2,17 @@
 Quiz API endpoints for quiz generation and management.
 """
 
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, BackgroundTasks, Response
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import TypeAdapter
 
+from app.core.config import settings
 from app.core.mongodb import get_database
 from app.api.api_v1.endpoints.auth import get_current_user
 from app.models.user import User as UserModel
@@ -16,16 +23,54 @@ from app.schemas.quiz import (
     QuizGenerationStatus
 )
 from app.services.quiz_service import QuizService
+from app.utils.singleflight import SingleFlight
 
 router = APIRouter()
 
+# QuizService keeps no per-request state, so one instance serves every request
+_quiz_service = QuizService()
+
+
+def get_quiz_service() -> QuizService:
+    """Return the QuizService shared by all quiz requests."""
+    return _quiz_service
+
+
+# List responses are validated in one pass rather than one model construction per item
+_QUIZ_LIST_ADAPTER = TypeAdapter(List[QuizResponse])
+_ATTEMPT_LIST_ADAPTER = TypeAdapter(List[QuizAttemptResponse])
+
+# Concurrent retries of the same attempt submission are scored once
+_attempt_inflight = SingleFlight()
+
+
+def _attempt_key(*parts: str) -> str:
+    """Build the idempotency key for a quiz attempt submission; parts are hashed as a JSON array so they cannot run together."""
+    return hashlib.sha256(orjson.dumps(parts)).hexdigest()
+
+
+# Health probes hit this constantly; the body never changes.
+# Registered before /{quiz_id} so the path is not captured as a quiz ID
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "quiz_service",
+    "version": "1.0.0"
+})
+
+
+@router.get("/health")
+async def health_check() -> Response:
+    """Health check endpoint for quiz service."""
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
 
 # Quiz Generation Endpoints
 @router.post("/generate", response_model=QuizGenerationResponse)
 async def generate_quizzes(
     request: QuizGenerationRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service)
     # current_user: UserModel = Depends(get_current_user)  # Temporarily disabled for testing
 ) -> QuizGenerationResponse:
     """
@@ -55,13 +100,12 @@ async def generate_quizzes(
     ```
     """
     try:
-        quiz_service = QuizService()
         result = await quiz_service.generate_quizzes_for_course(db, request)
         
         return QuizGenerationResponse(
             success=result["success"],
             message=result["message"],
-            generated_quizzes=[QuizResponse(**quiz) for quiz in result["generated_quizzes"]],
+            generated_quizzes=_QUIZ_LIST_ADAPTER.validate_python(result["generated_quizzes"]),
             skipped_modules=result["skipped_modules"],
             errors=result["errors"]
         )
@@ -77,6 +121,7 @@ async def generate_quizzes(
 async def get_quiz_generation_status(
     course_id: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizGenerationStatus:
     """
@@ -84,23 +129,15 @@ async def get_quiz_generation_status(
     Shows how many modules have quizzes vs how many don't.
     """
     try:
-        quiz_service = QuizService()
-        
-        # Get all quizzes for the course
-        quizzes = await quiz_service.get_quizzes_by_course(db, course_id)
-        
-        # Get course modules info
-        modules_info = await quiz_service.get_course_modules_info(db, course_id)
+        # Only the distinct module codes, the newest quiz and the module count are needed
+        modules_with_quizzes, last_generated, total_modules = await asyncio.gather(
+            quiz_service.count_modules_with_quizzes(db, course_id),
+            quiz_service.get_last_generated_at(db, course_id),
+            quiz_service.count_course_modules(db, course_id)
+        )
         
-        modules_with_quizzes = len(set(quiz.module_code for quiz in quizzes if quiz.module_code))
-        total_modules = len(modules_info)
         modules_without_quizzes = total_modules - modules_with_quizzes
         
-        # Get last generation time
-        last_generated = None
-        if quizzes:
-            last_generated = max(quiz.created_at for quiz in quizzes)
-        
         return QuizGenerationStatus(
             course_id=course_id,
             total_modules=total_modules,
@@ -121,6 +158,7 @@ async def get_quiz_generation_status(
 async def create_quiz(
     quiz_data: QuizCreate,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizResponse:
     """
@@ -147,7 +185,6 @@ async def create_quiz(
     ```
     """
     try:
-        quiz_service = QuizService()
         quiz = await quiz_service.create_quiz(db, quiz_data)
         return QuizResponse(**quiz.to_dict())
         
@@ -162,10 +199,10 @@ async def create_quiz(
 async def get_quiz(
     quiz_id: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizResponse:
     """Get a specific quiz by ID."""
-    quiz_service = QuizService()
     quiz = await quiz_service.get_quiz(db, quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -178,10 +215,10 @@ async def update_quiz(
     quiz_id: str,
     quiz_update: QuizUpdate,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizResponse:
     """Update an existing quiz."""
-    quiz_service = QuizService()
     quiz = await quiz_service.update_quiz(db, quiz_id, quiz_update)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -193,10 +230,10 @@ async def update_quiz(
 async def delete_quiz(
     quiz_id: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> Dict[str, str]:
     """Delete a quiz (soft delete)."""
-    quiz_service = QuizService()
     success = await quiz_service.delete_quiz(db, quiz_id)
     if not success:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -211,6 +248,7 @@ async def get_quizzes_by_course(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizListResponse:
     """
@@ -223,19 +261,14 @@ async def get_quizzes_by_course(
     - **size**: Number of items per page
     """
     try:
-        quiz_service = QuizService()
-        quizzes = await quiz_service.get_quizzes_by_course(db, course_id, module_code)
-        
-        # Apply pagination
-        total = len(quizzes)
-        start = (page - 1) * size
-        end = start + size
-        paginated_quizzes = quizzes[start:end]
+        paginated_quizzes, total = await quiz_service.get_quizzes_by_course_paged(
+            db, course_id, module_code, skip=(page - 1) * size, limit=size
+        )
         
         pages = (total + size - 1) // size  # Ceiling division
         
         return QuizListResponse(
-            quizzes=[QuizResponse(**quiz.to_dict()) for quiz in paginated_quizzes],
+            quizzes=_QUIZ_LIST_ADAPTER.validate_python([quiz.to_dict() for quiz in paginated_quizzes]),
             total=total,
             page=page,
             size=size,
@@ -253,12 +286,18 @@ async def get_quizzes_by_course(
 @router.post("/attempt", response_model=QuizAttemptResponse)
 async def create_quiz_attempt(
     attempt_data: QuizAttemptCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> QuizAttemptResponse:
     """
     Submit a quiz attempt.
     
+    Replays return the originally scored attempt instead of recording a new one: requests
+    repeating an **Idempotency-Key** header within a day, and identical submissions without
+    the header within a few seconds (retries of the same request).
+    
     **Example:**
     ```json
     {
@@ -287,12 +326,32 @@ async def create_quiz_attempt(
             for answer in attempt_data.answers
         ]
         
-        quiz_service = QuizService()
-        attempt = await quiz_service.create_quiz_attempt(
-            db, str(current_user.id), attempt_data.quiz_id, attempt_data.user_program_id, answers
-        )
+        user_id = str(current_user.id)
+        
+        if idempotency_key:
+            key = _attempt_key(user_id, idempotency_key)
+            window = settings.quiz_attempt_idempotency_ttl
+        else:
+            key = _attempt_key(
+                user_id, attempt_data.quiz_id, attempt_data.user_program_id, orjson.dumps(answers).decode()
+            )
+            window = settings.quiz_attempt_dedup_window
+        
+        async def submit():
+            stored = await quiz_service.get_idempotent_attempt(
+                db, key, datetime.now(timezone.utc) - timedelta(seconds=window)
+            )
+            if stored is not None:
+                return stored
+            
+            attempt = await quiz_service.create_quiz_attempt(
+                db, user_id, attempt_data.quiz_id, attempt_data.user_program_id, answers
+            )
+            response = QuizAttemptResponse(**attempt.to_dict()).model_dump()
+            await quiz_service.save_idempotent_attempt(db, key, attempt.id, response)
+            return response
         
-        return QuizAttemptResponse(**attempt.to_dict())
+        return QuizAttemptResponse(**await _attempt_inflight.do(key, submit))
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -308,13 +367,13 @@ async def get_my_quiz_attempts(
     quiz_id: Optional[str] = Query(None, description="Filter by quiz ID"),
     user_program_id: Optional[str] = Query(None, description="Filter by user program ID"),
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> List[QuizAttemptResponse]:
     """Get all quiz attempts for the current user, optionally filtered by quiz ID and/or user program ID."""
     try:
-        quiz_service = QuizService()
         attempts = await quiz_service.get_user_quiz_attempts(db, str(current_user.id), quiz_id, user_program_id)
-        return [QuizAttemptResponse(**attempt.to_dict()) for attempt in attempts]
+        return _ATTEMPT_LIST_ADAPTER.validate_python([attempt.to_dict() for attempt in attempts])
         
     except Exception as e:
         raise HTTPException(
@@ -324,50 +383,28 @@ async def get_my_quiz_attempts(
 
 
 # Utility Endpoints
-@router.get("/health")
-async def health_check() -> Dict[str, str]:
-    """Health check endpoint for quiz service."""
-    return {
-        "status": "healthy",
-        "service": "quiz_service",
-        "version": "1.0.0"
-    }
-
-
 @router.get("/stats/course/{course_id}")
 async def get_course_quiz_stats(
     course_id: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
+    quiz_service: QuizService = Depends(get_quiz_service),
     current_user: UserModel = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Get quiz statistics for a course."""
     try:
-        quiz_service = QuizService()
-        quizzes = await quiz_service.get_quizzes_by_course(db, course_id)
+        stats = await quiz_service.get_course_quiz_stats(db, course_id)
         
-        stats = {
-            "total_quizzes": len(quizzes),
-            "total_questions": sum(quiz.total_questions for quiz in quizzes),
-            "difficulty_distribution": {},
-            "modules_with_quizzes": len(set(quiz.module_code for quiz in quizzes if quiz.module_code)),
-            "average_questions_per_quiz": 0,
-            "last_generated": None
+        total_quizzes = stats["total_quizzes"]
+        last_generated = stats["last_generated"]
+        return {
+            "total_quizzes": total_quizzes,
+            "total_questions": stats["total_questions"],
+            "difficulty_distribution": stats["difficulty_distribution"],
+            "modules_with_quizzes": stats["modules_with_quizzes"],
+            "average_questions_per_quiz": round(stats["total_questions"] / total_quizzes, 1) if total_quizzes else 0,
+            "last_generated": last_generated.isoformat() if last_generated else None
         }
         
-        if quizzes:
-            # Calculate difficulty distribution
-            for quiz in quizzes:
-                difficulty = quiz.difficulty or "medium"
-                stats["difficulty_distribution"][difficulty] = stats["difficulty_distribution"].get(difficulty, 0) + 1
-            
-            # Calculate average questions per quiz
-            stats["average_questions_per_quiz"] = round(stats["total_questions"] / len(quizzes), 1)
-            
-            # Get last generation time
-            stats["last_generated"] = max(quiz.created_at for quiz in quizzes).isoformat()
-        
-        return stats
-        
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,22 +1,75 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, Optional
 import logging
 
+import orjson
+
 from app.schemas.summary import (
     SummaryRequest, SummaryResponse,
     KeyPointsRequest, KeyPointsResponse,
     SentimentRequest, SentimentResponse,
     TextAnalysisRequest, TextAnalysisResponse
 )
-from app.services.summary_service import summary_service
+from app.services.summary_service import SummaryService, summary_service
+from app.core import llm_cache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+async def _cached_result(endpoint: str, text: str, *params: Any, call: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Return a summary_service result from the LLM response cache, calling Gemini only on a miss.
+    Results carrying an error are returned but not cached, so the next request retries.
+    """
+    async def load():
+        return orjson.dumps(await call()).decode()
+
+    payload = await llm_cache.get_or_set(
+        llm_cache.make_key("summary", endpoint, text, *(str(param) for param in params)),
+        load,
+        should_cache=lambda value: not orjson.loads(value).get("error")
+    )
+    return orjson.loads(payload)
+
+
+async def _summarize(service: SummaryService, text: str, max_length: Optional[int], style: str) -> dict:
+    """Summarize text through the response cache."""
+    return await _cached_result(
+        "summarize", text, max_length, style,
+        call=lambda: service.summarize_text(text=text, max_length=max_length, style=style)
+    )
+
+
+async def _key_points(service: SummaryService, text: str, num_points: int) -> dict:
+    """Extract key points through the response cache."""
+    return await _cached_result(
+        "key-points", text, num_points,
+        call=lambda: service.extract_key_points(text=text, num_points=num_points)
+    )
+
+
+async def _sentiment(service: SummaryService, text: str) -> dict:
+    """Analyze sentiment through the response cache."""
+    return await _cached_result(
+        "sentiment", text,
+        call=lambda: service.analyze_sentiment(text=text)
+    )
+
+
+def get_summary_service() -> SummaryService:
+    """Return the process-wide SummaryService."""
+    return summary_service
+
 @router.post("/summarize", response_model=SummaryResponse)
-async def summarize_text(request: SummaryRequest) -> SummaryResponse:
+async def summarize_text(
+    request: SummaryRequest,
+    service: SummaryService = Depends(get_summary_service)
+) -> SummaryResponse:
     """
     Summarize text using Google's Generative AI.
     
@@ -31,11 +84,7 @@ async def summarize_text(request: SummaryRequest) -> SummaryResponse:
                 detail="Google API key not configured. Please contact administrator."
             )
         
-        result = await summary_service.summarize_text(
-            text=request.text,
-            max_length=request.max_length,
-            style=request.style.value
-        )
+        result = await _summarize(service, request.text, request.max_length, request.style.value)
         
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
@@ -49,7 +98,10 @@ async def summarize_text(request: SummaryRequest) -> SummaryResponse:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/key-points", response_model=KeyPointsResponse)
-async def extract_key_points(request: KeyPointsRequest) -> KeyPointsResponse:
+async def extract_key_points(
+    request: KeyPointsRequest,
+    service: SummaryService = Depends(get_summary_service)
+) -> KeyPointsResponse:
     """
     Extract key points from text using Google's Generative AI.
     
@@ -63,10 +115,7 @@ async def extract_key_points(request: KeyPointsRequest) -> KeyPointsResponse:
                 detail="Google API key not configured. Please contact administrator."
             )
         
-        result = await summary_service.extract_key_points(
-            text=request.text,
-            num_points=request.num_points
-        )
+        result = await _key_points(service, request.text, request.num_points)
         
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
@@ -80,7 +129,10 @@ async def extract_key_points(request: KeyPointsRequest) -> KeyPointsResponse:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/sentiment", response_model=SentimentResponse)
-async def analyze_sentiment(request: SentimentRequest) -> SentimentResponse:
+async def analyze_sentiment(
+    request: SentimentRequest,
+    service: SummaryService = Depends(get_summary_service)
+) -> SentimentResponse:
     """
     Analyze sentiment of text using Google's Generative AI.
     
@@ -93,7 +145,7 @@ async def analyze_sentiment(request: SentimentRequest) -> SentimentResponse:
                 detail="Google API key not configured. Please contact administrator."
             )
         
-        result = await summary_service.analyze_sentiment(text=request.text)
+        result = await _sentiment(service, request.text)
         
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
@@ -107,7 +159,10 @@ async def analyze_sentiment(request: SentimentRequest) -> SentimentResponse:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/analyze", response_model=TextAnalysisResponse)
-async def analyze_text(request: TextAnalysisRequest) -> TextAnalysisResponse:
+async def analyze_text(
+    request: TextAnalysisRequest,
+    service: SummaryService = Depends(get_summary_service)
+) -> TextAnalysisResponse:
     """
     Comprehensive text analysis including summary, key points, and sentiment.
     
@@ -129,42 +184,32 @@ async def analyze_text(request: TextAnalysisRequest) -> TextAnalysisResponse:
         word_count = len(request.text.split())
         result = {"word_count": word_count}
         
-        # Generate summary if requested
+        # The requested parts are independent Gemini calls, so they run concurrently
+        parts = []
         if request.include_summary:
-            summary_result = await summary_service.summarize_text(
-                text=request.text,
-                max_length=request.max_summary_length,
-                style=request.summary_style.value
-            )
-            if summary_result.get("error"):
-                result["error"] = f"Summary error: {summary_result['error']}"
-            else:
-                result["summary"] = SummaryResponse(**summary_result)
-        
-        # Extract key points if requested
+            parts.append(("summary", "Summary", SummaryResponse, _summarize(
+                service, request.text, request.max_summary_length, request.summary_style.value
+            )))
         if request.include_key_points:
-            key_points_result = await summary_service.extract_key_points(
-                text=request.text,
-                num_points=request.num_key_points
-            )
-            if key_points_result.get("error"):
-                if "error" in result:
-                    result["error"] += f"; Key points error: {key_points_result['error']}"
-                else:
-                    result["error"] = f"Key points error: {key_points_result['error']}"
-            else:
-                result["key_points"] = KeyPointsResponse(**key_points_result)
-        
-        # Analyze sentiment if requested
+            parts.append(("key_points", "Key points", KeyPointsResponse, _key_points(
+                service, request.text, request.num_key_points
+            )))
         if request.include_sentiment:
-            sentiment_result = await summary_service.analyze_sentiment(text=request.text)
-            if sentiment_result.get("error"):
-                if "error" in result:
-                    result["error"] += f"; Sentiment error: {sentiment_result['error']}"
-                else:
-                    result["error"] = f"Sentiment error: {sentiment_result['error']}"
+            parts.append(("sentiment", "Sentiment", SentimentResponse, _sentiment(service, request.text)))
+        
+        part_results = await asyncio.gather(*(part[3] for part in parts), return_exceptions=True)
+        
+        errors = []
+        for (field, label, response_model, _), part_result in zip(parts, part_results):
+            if isinstance(part_result, Exception):
+                logger.error(f"Error in analyze_text {field}: {part_result}")
+                errors.append(f"{label} error: {part_result}")
+            elif part_result.get("error"):
+                errors.append(f"{label} error: {part_result['error']}")
             else:
-                result["sentiment"] = SentimentResponse(**sentiment_result)
+                result[field] = response_model(**part_result)
+        if errors:
+            result["error"] = "; ".join(errors)
         
         return TextAnalysisResponse(**result)
         
@@ -183,6 +228,7 @@ async def health_check() -> Dict[str, Any]:
         "status": "healthy" if settings.google_api_key else "unhealthy",
         "google_api_configured": bool(settings.google_api_key),
         "service": "text-summarization",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "cache": llm_cache.stats()
     }
 
@@ -1,19 +1,38 @@
+import asyncio
 from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from bson import ObjectId
 
+from app.core.config import settings
 from app.core.mongodb import get_database
 from app.schemas.translation import TranslationRequest, TranslationResponse, TranslationStatus
 from app.services.translation_service import TranslationService
 from app.api.api_v1.endpoints.auth import get_current_user
 from app.models.user import User as UserModel
+from app.utils.singleflight import SingleFlight
 
 router = APIRouter()
 
 
+def get_translation_service(request: Request) -> TranslationService:
+    """Return the TranslationService shared by all translation requests, creating it on first use."""
+    service = getattr(request.app.state, "translation_service", None)
+    if service is None:
+        service = TranslationService(get_database())
+        request.app.state.translation_service = service
+    return service
+
+
+# Caps Gemini calls from batch translations across all concurrent batch requests
+_batch_semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+# Repeated asset/language pairs share one translation instead of racing the "already exists" check
+_batch_inflight = SingleFlight()
+
+
 @router.post("/translate", response_model=TranslationResponse)
 async def translate_asset(
     request: TranslationRequest,
+    translation_service: TranslationService = Depends(get_translation_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
@@ -31,9 +50,6 @@ async def translate_asset(
         )
     
     try:
-        db = get_database()
-        translation_service = TranslationService(db)
-        
         # Create translation
         translation = await translation_service.create_translation(
             asset_code=request.asset_code,
@@ -59,6 +75,7 @@ async def translate_asset(
 @router.get("/asset/{asset_code}/translations")
 async def get_asset_translations(
     asset_code: str,
+    translation_service: TranslationService = Depends(get_translation_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
@@ -67,9 +84,6 @@ async def get_asset_translations(
     - **asset_code**: The code of the asset to get translations for
     """
     try:
-        db = get_database()
-        translation_service = TranslationService(db)
-        
         # Get available translations
         translations = await translation_service.get_available_translations(asset_code)
         
@@ -86,6 +100,7 @@ async def get_asset_translations(
 async def get_asset_by_language(
     asset_code: str,
     language: str,
+    translation_service: TranslationService = Depends(get_translation_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
@@ -102,9 +117,6 @@ async def get_asset_by_language(
         )
     
     try:
-        db = get_database()
-        translation_service = TranslationService(db)
-        
         # Get asset by code and language
         asset = await translation_service.get_asset_by_code(asset_code, language)
         
@@ -128,6 +140,7 @@ async def get_asset_by_language(
 @router.post("/translate/batch")
 async def translate_multiple_assets(
     requests: list[TranslationRequest],
+    translation_service: TranslationService = Depends(get_translation_service),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
@@ -135,52 +148,52 @@ async def translate_multiple_assets(
     
     - **requests**: List of translation requests
     """
-    results = []
-    
-    for request in requests:
+    async def translate_one(request: TranslationRequest) -> Dict[str, Any]:
+        # Validate target language
+        if request.target_language not in ["hi", "te"]:
+            return {
+                "asset_code": request.asset_code,
+                "target_language": request.target_language,
+                "status": "error",
+                "error": "Target language must be 'hi' (Hindi) or 'te' (Telugu)"
+            }
+        
+        async def create():
+            async with _batch_semaphore:
+                return await translation_service.create_translation(
+                    asset_code=request.asset_code,
+                    target_language=request.target_language,
+                    content=request.content
+                )
+        
         try:
-            # Validate target language
-            if request.target_language not in ["hi", "te"]:
-                results.append({
-                    "asset_code": request.asset_code,
-                    "target_language": request.target_language,
-                    "status": "error",
-                    "error": "Target language must be 'hi' (Hindi) or 'te' (Telugu)"
-                })
-                continue
-            
-            db = get_database()
-            translation_service = TranslationService(db)
-            
             # Create translation
-            translation = await translation_service.create_translation(
-                asset_code=request.asset_code,
-                target_language=request.target_language,
-                content=request.content
-            )
+            translation = await _batch_inflight.do((request.asset_code, request.target_language), create)
             
             if translation:
-                results.append({
+                return {
                     "asset_code": request.asset_code,
                     "target_language": request.target_language,
                     "status": "success",
                     "translation": translation
-                })
-            else:
-                results.append({
-                    "asset_code": request.asset_code,
-                    "target_language": request.target_language,
-                    "status": "error",
-                    "error": "Failed to create translation"
-                })
+                }
+            return {
+                "asset_code": request.asset_code,
+                "target_language": request.target_language,
+                "status": "error",
+                "error": "Failed to create translation"
+            }
                 
         except Exception as e:
-            results.append({
+            return {
                 "asset_code": request.asset_code,
                 "target_language": request.target_language,
                 "status": "error",
                 "error": str(e)
-            })
+            }
+    
+    # Items are independent, so they are translated concurrently; results keep the request order
+    results = await asyncio.gather(*(translate_one(request) for request in requests))
     
     return {
         "total_requests": len(requests),
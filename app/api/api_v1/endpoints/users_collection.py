@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import re
+import orjson
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from app.schemas.users_collection import (
     UsersCollectionCreate,
@@ -10,12 +15,67 @@ from app.schemas.users_collection import (
     UsersCollectionResponse,
     UsersCollectionNotFound
 )
-from app.core.mongodb import get_database
+from app.core.mongodb import get_database, mongodb
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_UTC = timezone.utc
+
+_OID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+
+
+def _parse_user_id(user_id: str) -> ObjectId:
+    """Convert a user ID to an ObjectId, rejecting anything but 24 hex characters with a 400."""
+    # fullmatch so a trailing newline is not accepted by the $ anchor
+    if not _OID_RE.fullmatch(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid user ID format: {user_id}"
+        )
+    return ObjectId(user_id)
+
+
+def _dump_user(user: dict) -> dict:
+    """
+    Convert a users document into the response shape, validating it so a malformed
+    record fails cleanly instead of leaking out incomplete.
+    """
+    user["id"] = str(user.pop("_id"))
+    return UsersCollectionResponse.model_validate(user).model_dump()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Export All User Preferences",
+    description="Stream every user preference document as newline-delimited JSON.",
+    responses={
+        200: {
+            "description": "One JSON user preference object per line",
+            "content": {"application/x-ndjson": {}}
+        }
+    }
+)
+async def exportUserPreferences(
+    db=Depends(get_database)
+):
+    """
+    Export all user preferences as NDJSON.
+    
+    Documents are read from the cursor and written out one at a time, so memory
+    use does not grow with the size of the users collection.
+    """
+    logger.info("Exporting all user preferences")
+    
+    async def ndjson_generator():
+        async for user in db.users.find({}).sort("_id", 1):
+            yield orjson.dumps(_dump_user(user)) + b"\n"
+    
+    return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+
 @router.get(
     "/{user_id}",
     response_model=UsersCollectionResponse,
@@ -51,13 +111,7 @@ async def getUserPreferences(
         logger.info(f"Fetching user preferences for user ID: {user_id}")
         
         # Convert string to ObjectId
-        try:
-            object_id = ObjectId(user_id)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid user ID format: {user_id}"
-            )
+        object_id = _parse_user_id(user_id)
         
         # Find user in MongoDB users collection
         user = await db.users.find_one({"_id": object_id})
@@ -181,26 +235,33 @@ async def saveUserPreferences(
     try:
         logger.info(f"Saving user preferences for email: {user_preferences.email}")
         
-        # Check if user already exists by email
-        existing_user = await db.users.find_one({"email": user_preferences.email})
-        if existing_user:
+        # Without the unique email index (e.g. its build failed on existing duplicates),
+        # fall back to checking for the email before inserting
+        if not mongodb.users_email_unique:
+            existing_user = await db.users.find_one({"email": user_preferences.email}, {"_id": 1})
+            if existing_user:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"User preferences already exist for email: {user_preferences.email}"
+                )
+        
+        # Prepare data for insertion
+        user_data = user_preferences.model_dump()
+        user_data["createdAt"] = datetime.now(_UTC)
+        
+        # Insert into MongoDB; the unique email index, when present, rejects existing users
+        try:
+            result = await db.users.insert_one(user_data)
+        except DuplicateKeyError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"User preferences already exist for email: {user_preferences.email}"
             )
         
-        # Prepare data for insertion
-        user_data = user_preferences.dict()
-        user_data["createdAt"] = datetime.utcnow()
-        
-        # Insert into MongoDB
-        result = await db.users.insert_one(user_data)
-        
         if result.inserted_id:
-            # Fetch the created document
-            created_user = await db.users.find_one({"_id": result.inserted_id})
-            created_user["id"] = str(created_user["_id"])
-            del created_user["_id"]
+            # insert_one added the _id to user_data, so the stored document needs no re-read
+            created_user = user_data
+            created_user["id"] = str(created_user.pop("_id"))
             
             logger.info(f"Successfully saved user preferences for email: {user_preferences.email}")
             return UsersCollectionResponse(**created_user)
@@ -256,44 +317,31 @@ async def updateUserPreferences(
         logger.info(f"Updating user preferences for user ID: {user_id}")
         
         # Convert string to ObjectId
-        try:
-            object_id = ObjectId(user_id)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid user ID format: {user_id}"
+        object_id = _parse_user_id(user_id)
+        
+        # Prepare update data (only fields the client sent with non-None values)
+        update_data = user_preferences_update.model_dump(exclude_unset=True, exclude_none=True)
+        
+        # Update in MongoDB and get the updated document back in the same round trip
+        if update_data:
+            updated_user = await db.users.find_one_and_update(
+                {"_id": object_id},
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
+        else:
+            updated_user = await db.users.find_one({"_id": object_id})
         
-        # Check if user exists
-        existing_user = await db.users.find_one({"_id": object_id})
-        if not existing_user:
+        if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User preferences not found for user ID: {user_id}"
             )
         
-        # Prepare update data (only include non-None values)
-        update_data = {k: v for k, v in user_preferences_update.dict().items() if v is not None}
+        updated_user["id"] = str(updated_user.pop("_id"))
         
-        # Update in MongoDB
-        result = await db.users.update_one(
-            {"_id": object_id},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count > 0:
-            # Fetch the updated document
-            updated_user = await db.users.find_one({"_id": object_id})
-            updated_user["id"] = str(updated_user["_id"])
-            del updated_user["_id"]
-            
-            logger.info(f"Successfully updated user preferences for user ID: {user_id}")
-            return UsersCollectionResponse(**updated_user)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update user preferences"
-            )
+        logger.info(f"Successfully updated user preferences for user ID: {user_id}")
+        return UsersCollectionResponse(**updated_user)
             
     except HTTPException:
         raise
@@ -309,7 +357,7 @@ async def updateUserPreferences(
     response_model=List[UsersCollectionResponse],
     status_code=status.HTTP_200_OK,
     summary="Get All User Preferences",
-    description="Retrieve all user preferences from the users collection.",
+    description="Retrieve a page of user preferences from the users collection.",
     responses={
         200: {
             "description": "User preferences retrieved successfully",
@@ -321,27 +369,31 @@ async def updateUserPreferences(
     }
 )
 async def getAllUserPreferences(
+    skip: int = Query(0, ge=0, description="Number of users to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of users to return"),
     db=Depends(get_database)
 ):
     """
-    Get all user preferences from the users collection.
+    Get a page of user preferences from the users collection.
+    
+    - **skip**: Number of users to skip
+    - **limit**: Maximum number of users to return (up to 1000)
     
-    Returns a list of all user preferences in the database.
+    Use the export endpoint to retrieve the whole collection.
     """
     try:
-        logger.info("Fetching all user preferences")
+        logger.info(f"Fetching user preferences (skip={skip}, limit={limit})")
         
-        # Find all users in MongoDB
-        users_cursor = db.users.find({})
-        users = await users_cursor.to_list(length=None)
+        # Find a page of users in MongoDB
+        users_cursor = db.users.find({}).sort("_id", 1).skip(skip).limit(limit)
         
         # Convert MongoDB ObjectIds to strings
-        for user in users:
-            user["id"] = str(user["_id"])
-            del user["_id"]
+        users = [_dump_user(user) async for user in users_cursor]
         
         logger.info(f"Found {len(users)} user preferences")
-        return [UsersCollectionResponse(**user) for user in users]
+        # Already validated by _dump_user, so returned directly to skip a second pass;
+        # response_model is kept on the route for the OpenAPI schema
+        return ORJSONResponse(users)
         
     except Exception as e:
         logger.error(f"Error fetching all user preferences: {str(e)}")
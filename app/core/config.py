@@ -6,6 +6,10 @@ import os
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./app.db"
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 10
+    mongo_wait_queue_timeout_ms: int = 2000
+    mongo_server_selection_timeout_ms: int = 3000
     
     # Security
     secret_key: str = "your-secret-key-change-this-in-production"
@@ -15,6 +19,7 @@ class Settings(BaseSettings):
     # Environment
     environment: str = "development"
     debug: bool = True
+    log_level: str = "INFO"
     
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:8080"]
@@ -33,7 +38,32 @@ class Settings(BaseSettings):
     default_llm_model: str = "gemini-1.5-flash"
     max_tokens_default: int = 1000
     temperature_default: float = 0.7
-    
+    gemini_max_concurrency: int = 16
+    # Retries for rate-limited or temporarily unavailable Gemini calls, with exponential backoff
+    gemini_max_retries: int = 3
+    gemini_retry_base_delay: float = 1.0
+    # Quizzes with more questions than this are generated as background jobs
+    llm_quiz_sync_max_questions: int = 10
+    llm_job_ttl: int = 3600
+
+    # Caching
+    summary_status_cache_ttl: int = 120
+    summary_status_not_found_ttl: int = 15
+    summary_status_max_age: int = 60
+    summary_status_stale_while_revalidate: int = 300
+    llm_cache_ttl: int = 86400
+    llm_cache_maxsize: int = 2048
+    # /llm/generate requests that explicitly ask for a higher temperature want varied output, so skip the cache
+    llm_cache_max_temperature: float = 0.3
+    asset_lookup_cache_ttl: int = 30
+    course_cache_ttl: int = 30
+    # Quiz attempt replays: explicit Idempotency-Key headers, and identical resubmissions without one.
+    # The implicit window only covers client retries, so a deliberate retake with the same answers is recorded
+    quiz_attempt_idempotency_ttl: int = 86400
+    quiz_attempt_dedup_window: int = 5
+    # Stored course quiz stats are adjusted on every quiz write and rebuilt from scratch this often
+    quiz_stats_rebuild_interval: int = 3600
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Fallback to environment variable if not set in .env
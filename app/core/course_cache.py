@@ -0,0 +1,35 @@
+"""
+In-process cache for course and asset reads served by the /course routes.
+
+Entries live for course_cache_ttl seconds. Any write to the courses or assets collections in
+this worker should call ``invalidate()``; other workers keep their entries until the TTL expires.
+"""
+
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+_cache = TTLCache(maxsize=1_000, ttl=settings.course_cache_ttl)
+_inflight = SingleFlight()
+# Bumped by invalidate() so a load that started before a write does not cache what it read
+_generation = 0
+
+
+async def get_or_load(key: Hashable, load: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+    """Return the cached read for ``key``, loading it once for concurrent misses; None is not cached."""
+    value = _cache.get(key)
+    if value is None:
+        generation = _generation
+        value = await _inflight.do(key, load)
+        if value is not None and generation == _generation:
+            _cache.set(key, value)
+    return value
+
+
+def invalidate() -> None:
+    """Drop every cached course and asset read after a write."""
+    global _generation
+    _generation += 1
+    _cache.clear()
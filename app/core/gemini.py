@@ -0,0 +1,30 @@
+"""
+Process-wide Google Gemini client.
+"""
+
+import logging
+from typing import Optional
+
+import google.generativeai as genai
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+_model: Optional[genai.GenerativeModel] = None
+
+
+def get_gemini_model() -> Optional[genai.GenerativeModel]:
+    """Return the shared GenerativeModel, configuring the SDK on first use.
+
+    genai.configure() replaces the SDK's default client, and with it the underlying
+    gRPC channel, so it must run once per process rather than once per service instance.
+    """
+    global _model
+    if _model is None and settings.google_api_key:
+        genai.configure(api_key=settings.google_api_key)
+        _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        logger.info("Google Generative AI client initialized")
+    return _model
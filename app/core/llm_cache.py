@@ -0,0 +1,70 @@
+"""
+In-process cache for LLM completions, keyed on a hash of the inputs that shape the prompt.
+"""
+
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+_cache = TTLCache(maxsize=settings.llm_cache_maxsize, ttl=settings.llm_cache_ttl)
+# Identical requests arriving together share one LLM call instead of racing to fill the cache
+_inflight = SingleFlight()
+_stats = {"hits": 0, "misses": 0}
+
+
+def make_key(*parts: str) -> str:
+    """Build a cache key from the prompt inputs; they are hashed as a JSON array so no two splits of the same text collide."""
+    return hashlib.sha256(orjson.dumps(parts)).hexdigest()
+
+
+async def get_or_set(
+    key: str,
+    coro_factory: Callable[[], Awaitable[Optional[str]]],
+    should_cache: Optional[Callable[[str], bool]] = None
+) -> Optional[str]:
+    """
+    Return the cached completion for ``key``, generating and caching it on a miss.
+    ``should_cache`` can veto caching a completion that is non-empty but still unusable.
+    """
+    cached = _cache.get(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached
+    _stats["misses"] += 1
+
+    async def load():
+        value = await coro_factory()
+        # Empty completions are failures; leave them uncached so the next request retries
+        if value and (should_cache is None or should_cache(value)):
+            _cache.set(key, value)
+        return value
+
+    return await _inflight.do(key, load)
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached completion for ``key`` if there is one."""
+    return _cache.get(key)
+
+
+def put(key: str, value: str) -> None:
+    """Store a completion produced outside ``get_or_set``, e.g. by a streamed response."""
+    if value:
+        _cache.set(key, value)
+
+
+def stats() -> Dict[str, int]:
+    """Return hit and miss counts for ``get_or_set`` since startup or the last ``clear``."""
+    return {**_stats, "size": len(_cache)}
+
+
+def clear() -> None:
+    """Drop every cached completion and reset the hit and miss counts."""
+    _cache.clear()
+    _stats["hits"] = 0
+    _stats["misses"] = 0
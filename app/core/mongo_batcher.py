@@ -0,0 +1,74 @@
+"""
+Coalesces single-document inserts that arrive close together into one insert_many.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Set, Tuple
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+class MongoBatcher:
+    """Buffer inserts per collection for a short window and write them with one round-trip."""
+
+    def __init__(self, max_batch: int = 200, window: float = 0.02):
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: Dict[str, List[Tuple[dict, asyncio.Future]]] = {}
+        self._collections: Dict[str, Any] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(self, db, collection: str, document: dict) -> Any:
+        """Queue ``document`` for insertion into ``collection`` and return its inserted ID."""
+        future = asyncio.get_running_loop().create_future()
+        self._collections[collection] = db[collection]
+        batch = self._pending.setdefault(collection, [])
+        batch.append((document, future))
+
+        if len(batch) >= self.max_batch:
+            timer = self._timers.pop(collection, None)
+            if timer is not None:
+                timer.cancel()
+            # Flush in its own task so a cancelled submitter cannot strand the rest of the batch
+            task = asyncio.create_task(self._flush(collection))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+        elif collection not in self._timers:
+            self._timers[collection] = asyncio.create_task(self._flush_later(collection))
+        return await future
+
+    async def _flush_later(self, collection: str) -> None:
+        await asyncio.sleep(self.window)
+        self._timers.pop(collection, None)
+        await self._flush(collection)
+
+    async def _flush(self, collection: str) -> None:
+        batch = self._pending.pop(collection, None)
+        if not batch:
+            return
+        documents = [document for document, _ in batch]
+        failed = {}
+        try:
+            # insert_many fills in _id on each document, so IDs are known even on partial failure
+            await self._collections[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = Exception(error.get("errmsg", "Insert failed"))
+        except Exception as e:
+            logger.error(f"Batched insert into {collection} failed: {e}")
+            failed = {index: e for index in range(len(batch))}
+
+        for index, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(document["_id"])
+
+
+mongo_batcher = MongoBatcher()
@@ -8,13 +8,22 @@ logger = logging.getLogger(__name__)
 class MongoDB:
     client: AsyncIOMotorClient = None
     database = None
+    # Whether users.email is known to be unique-indexed; saveUserPreferences checks for
+    # an existing email itself until it is
+    users_email_unique: bool = False
 
 mongodb = MongoDB()
 
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        mongodb.client = AsyncIOMotorClient(settings.database_url)
+        mongodb.client = AsyncIOMotorClient(
+            settings.database_url,
+            maxPoolSize=settings.mongo_max_pool_size,
+            minPoolSize=settings.mongo_min_pool_size,
+            waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms,
+            serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms
+        )
         # Test the connection
         await mongodb.client.admin.command('ping')
         logger.info("Connected to MongoDB successfully")
@@ -36,7 +45,84 @@ def get_database():
     """Get database instance"""
     return mongodb.database
 
-# Synchronous client for testing
+async def _create_index(db, collection: str, keys, **kwargs) -> bool:
+    """Create one index, logging instead of raising so a failure does not skip the others"""
+    try:
+        await db[collection].create_index(keys, **kwargs)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create MongoDB index {collection}.{kwargs.get('name', keys)}: {e}")
+        return False
+
+async def ensure_indexes():
+    """Create the indexes the request handlers rely on; existing indexes are left untouched"""
+    db = mongodb.database
+    if db is None:
+        return
+    # /getAsset matches on code plus either the full profile or style="original"
+    await _create_index(
+        db, "assets",
+        [("code", 1), ("domain", 1), ("hobby", 1), ("style", 1)],
+        name="code_profile_style_idx"
+    )
+    await _create_index(db, "assets", [("code", 1), ("style", 1)], name="code_style_idx")
+    # /get-or-generate looks up a transformation by its full input combination
+    await _create_index(
+        db, "transformed-assets",
+        [("assetCode", 1), ("style", 1), ("domain", 1), ("hobby", 1)],
+        name="lookup_idx"
+    )
+    # Quiz listings filter by course (and optionally module) and page newest first
+    await _create_index(
+        db, "quizzes",
+        [("course_id", 1), ("module_code", 1), ("created_at", -1)],
+        name="course_module_created_idx"
+    )
+    # Replayed quiz attempt submissions expire after the idempotency window
+    await _create_index(
+        db, "quiz_attempt_idempotency",
+        "created_at",
+        name="created_at_ttl",
+        expireAfterSeconds=settings.quiz_attempt_idempotency_ttl
+    )
+    # Background /llm generation jobs expire a while after they start
+    await _create_index(
+        db, "llm_jobs",
+        "created_at",
+        name="created_at_ttl",
+        expireAfterSeconds=settings.llm_job_ttl
+    )
+    # /updateAsset upserts one status record per user, course and asset; existing
+    # duplicate records make this build fail
+    await _create_index(
+        db, "userassetstatus",
+        [("course", 1), ("asset", 1), ("user", 1)],
+        name="course_asset_user_uniq",
+        unique=True
+    )
+    # saveUserPreferences relies on this to reject a second record for the same email,
+    # and falls back to looking the email up itself without it
+    mongodb.users_email_unique = await _create_index(
+        db, "users",
+        "email",
+        name="email_uniq",
+        unique=True,
+        partialFilterExpression={"email": {"$type": "string"}}
+    )
+    logger.info("MongoDB indexes verified")
+
+async def ping_mongodb() -> bool:
+    """Ping MongoDB through the shared async client without blocking the event loop"""
+    if mongodb.client is None:
+        return False
+    try:
+        await mongodb.client.admin.command('ping')
+        return True
+    except Exception as e:
+        logger.error(f"MongoDB ping failed: {e}")
+        return False
+
+# Synchronous client for standalone scripts; never call from request handlers
 def get_sync_client():
     """Get synchronous MongoDB client for testing"""
     return MongoClient(settings.database_url)
@@ -1,21 +1,28 @@
 from fastapi import FastAPI, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import time
 
 from app.core.config import settings
-from app.core.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.mongodb import connect_to_mongo, close_mongo_connection, ensure_indexes, get_database, ping_mongodb
 from app.api.api_v1.api import api_router
+from app.services.asset_summary_service import AssetSummaryService
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    setup_logging()
     await connect_to_mongo()
+    await ensure_indexes()
+    app.state.asset_summary_service = AssetSummaryService(get_database())
+    await app.state.asset_summary_service.verify_indexes()
     yield
     # Shutdown
     await close_mongo_connection()
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -24,6 +31,7 @@ app = FastAPI(
     version=settings.version,
     description=settings.description,
     openapi_url=f"{settings.api_v1_prefix}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -65,8 +73,7 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    from app.core.mongodb import test_mongodb_connection
-    mongodb_status = test_mongodb_connection()
+    mongodb_status = await ping_mongodb()
     return {
         "status": "healthy", 
         "timestamp": time.time(),
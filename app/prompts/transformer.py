@@ -0,0 +1,179 @@
+"""
+Prompt templates for the content transformer endpoints.
+
+Static instructions come first and the request-specific inputs last, so providers
+with automatic prefix caching can reuse the shared part of the prompt.
+"""
+
+from string import Template
+from types import MappingProxyType
+
+STYLE_PROMPTS = MappingProxyType({
+    "storytelling": """
+### Storytelling Mode:
+- Convert the given content into a short storytelling analogy.
+- Make it relevant to the given domain and hobby.
+- Use simple, engaging language.
+- Create a narrative that helps explain the concept through a relatable story.
+""",
+    "visual_cue": """
+### Visual Cue Mode:
+- Convert the content into simple, symbolic visual representations (emoji flows, ASCII diagrams, metaphors).
+- Focus on clarity, simplicity, and instant understanding at a glance.
+- Provide 3–4 different cues for the same concept.
+- Each visual cue must connect the concept to the user's domain and hobby.
+- Use emojis, arrows, or short symbolic flows instead of long text.
+- Keep it fun, relatable, and visually intuitive.
+
+Format your response as:
+VISUAL CUE 1: [Emoji flow or diagram]
+VISUAL CUE 2: [Emoji flow or diagram]
+VISUAL CUE 3: [Emoji flow or diagram]
+VISUAL CUE 4: [Optional extra if needed]
+""",
+    "summary": """
+### Summary Mode:
+- Generate a concise summary of the content.
+- Keep it framed in the context of the given domain and hobby.
+- Make it clear, informative, and easy to understand.
+- Use analogies from the hobby to explain domain concepts.
+""",
+    "original": """
+### Original Mode:
+- Return the content as-is without any transformation.
+- This is the original learning material in its basic form.
+- No domain or hobby contextualization needed.
+"""
+})
+
+# Everything up to the request inputs depends only on the style, so each style's
+# prefix is rendered once at import and shared verbatim by every request
+_PREFIX_TEMPLATE = Template("""You are an AI content transformer. 
+You will receive four inputs:
+1. Style (storytelling, visual_cue, or summary)
+2. Content (raw lecture, case study, or concept)
+3. Domain (e.g., Business, Engineering, Medicine, Education, etc.)
+4. Hobby (e.g., Movies, Cricket, Gaming, Music, etc.)
+
+Your task is to generate content in the specified style:
+
+$style_block
+
+### Examples for $style_title Mode:
+
+**Content:** "Neural networks learn patterns from data."
+**Domain:** Business
+**Hobby:** Cricket
+
+**Storytelling Mode Example:** 
+"Imagine a cricket coach who studies thousands of player stats (data) to predict the best batting order. That's how neural networks learn patterns to make predictions."
+
+**Visual Cue Mode Example:** 
+VISUAL CUE 1: 🏏📊➡️🧠➡️🎯 (Cricket data → Neural Network → Target prediction)
+VISUAL CUE 2: 📈📋➡️🤖➡️💼 (Business charts → AI brain → Better decisions)  
+VISUAL CUE 3: Data ➡️ NN ➡️ Pattern ➡️ 🏆 (Linear flow to success)
+VISUAL CUE 4: 🧠=🏏coach (Neural Network equals cricket coach analogy)
+
+**Summary Mode Example:** 
+"Neural networks are like a cricket coach for business — analyzing tons of data to spot patterns and make smarter predictions."
+
+---
+
+""")
+
+PROMPT_PREFIXES = MappingProxyType({
+    style: _PREFIX_TEMPLATE.substitute(style_block=style_block, style_title=style.title())
+    for style, style_block in STYLE_PROMPTS.items()
+})
+
+PROMPT_TEMPLATE = Template("""Now transform this content in $style style:
+
+**Style:** $style
+**Content:** "$content"
+**Domain:** $domain
+**Hobby:** $hobby
+
+Please provide ONLY the $style output without any formatting or labels:""")
+
+# Variants used when /getAsset derives a new style from an asset's original content
+PROFILE_STYLE_PROMPTS = MappingProxyType({
+    "storytelling": """
+### Storytelling Mode:
+- Convert the given content into a short storytelling analogy.
+- Make it relevant to the given domain and hobby.
+- Use simple, engaging language.
+- Create a narrative that helps explain the concept.
+""",
+    "visual_cue": """
+### Visual Cue Mode - Visual Instructions:
+- Create text-based visual cues that explain the content.
+- Use emojis, arrows (➡️), and symbolic representations.
+- Provide 3-4 different visual cue formats.
+- Make it hobby and domain relevant.
+- Focus on visual learning through text symbols.
+""",
+    "summary": """
+### Summary Mode:
+- Generate a concise summary of the content.
+- Make it clear, informative, and easy to understand.
+- Use analogies from the hobby to explain domain concepts.
+"""
+})
+
+DOMAIN_CONTEXTS = MappingProxyType({
+    "engineering-student": "Use examples in circuits, code snippets, algorithms, and technical implementations",
+    "medical-student": "Use case studies in healthcare, patient scenarios, medical procedures, and clinical examples", 
+    "business-student": "Use marketing examples, finance scenarios, business strategies, and corporate case studies",
+    "teacher-trainer": "Use classroom storytelling, pedagogy techniques, educational methods, and teaching scenarios",
+    "working-professional": "Use real-world workplace analogies, professional scenarios, industry examples, and practical applications"
+})
+
+PROFILE_PROMPT_TEMPLATE = Template("""You are an AI content transformer. 
+You will receive inputs for content transformation based on specific learner profiles.
+
+Domain Context: $domain_context
+Hobby Context: Connect concepts to $hobby for better relatability
+
+Your task is to generate content in the specified style:
+
+$style_block
+
+Now transform this content for $domain who loves $hobby:
+
+**Style:** $style
+**Content:** "$content"
+**Domain:** $domain - $domain_context
+**Hobby:** $hobby
+
+Please provide ONLY the $style output without any formatting or labels:""")
+
+
+def build_prompt(style: str, content: str, domain: str, hobby: str) -> str:
+    """Build the transformation prompt, falling back to summary mode for unknown styles."""
+    prefix = PROMPT_PREFIXES.get(style)
+    if prefix is None:
+        prefix = _PREFIX_TEMPLATE.substitute(style_block=STYLE_PROMPTS["summary"], style_title=style.title())
+    return prefix + PROMPT_TEMPLATE.substitute(
+        style=style,
+        content=content,
+        domain=domain,
+        hobby=hobby
+    )
+
+
+def build_profile_prompt(style: str, content: str, domain: str, hobby: str) -> str:
+    """Build the prompt for transforming original content for a learner's domain and hobby."""
+    return PROFILE_PROMPT_TEMPLATE.substitute(
+        style_block=PROFILE_STYLE_PROMPTS[style],
+        domain_context=DOMAIN_CONTEXTS.get(domain, f"Use examples relevant to {domain}"),
+        style=style,
+        content=content,
+        domain=domain,
+        hobby=hobby
+    )
+
+
+def postprocess(text: str) -> str:
+    """Trim a completion and drop the surrounding quotes the model sometimes adds."""
+    text = text.strip()
+    return text[1:-1] if len(text) >= 2 and text[0] == text[-1] == '"' else text
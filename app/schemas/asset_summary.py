@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 
 
@@ -18,8 +18,16 @@ class AssetSummaryResponse(BaseModel):
     summary: str
     summary_updated_at: datetime
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class AssetSummaryJob(BaseModel):
+    """Response schema for an accepted background summary generation"""
+    success: bool
+    message: str
+    asset_id: str
+    status: str  # "pending"
+    status_url: str
 
 
 class AssetSummaryStatus(BaseModel):
@@ -29,3 +37,5 @@ class AssetSummaryStatus(BaseModel):
     asset_id: str
     summary: Optional[str] = None
     summary_updated_at: Optional[datetime] = None
+    generation_status: Optional[str] = None  # "pending", "failed" or None when idle
+    error: Optional[str] = None
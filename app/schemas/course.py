@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 
 
@@ -22,8 +22,7 @@ class Asset(AssetBase):
     """Asset schema for responses"""
     id: str = Field(alias="_id")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ModuleBase(BaseModel):
@@ -68,8 +67,7 @@ class Course(CourseBase):
     updated_at: datetime
     modules: List[Module] = []  # Override to use Module instead of ModuleCreate for responses
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class CourseWithAssets(BaseModel):
@@ -80,8 +78,7 @@ class CourseWithAssets(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class CourseWithUserProgress(BaseModel):
@@ -92,5 +89,4 @@ class CourseWithUserProgress(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
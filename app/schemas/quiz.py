@@ -3,7 +3,7 @@ Quiz schemas for API validation and serialization.
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, ConfigDict
 from datetime import datetime
 import uuid
 
@@ -67,8 +67,7 @@ class QuizResponse(QuizBase):
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class QuizListResponse(BaseModel):
@@ -135,8 +134,7 @@ class QuizAttemptResponse(BaseModel):
     time_taken_seconds: Optional[int]
     is_completed: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Course and Module Integration Schemas
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -33,5 +33,4 @@ class UserAssetStatusResponse(UserAssetStatusBase):
     updated_at: datetime = Field(..., description="Last update timestamp")
     last_accessed: Optional[datetime] = Field(None, description="Last access timestamp")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
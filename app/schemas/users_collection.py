@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -27,8 +27,7 @@ class UsersCollectionResponse(UsersCollectionBase):
     id: str = Field(..., description="User document ID")
     createdAt: datetime = Field(..., description="Creation timestamp")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UsersCollectionNotFound(BaseModel):
     """Schema for when user is not found in users collection"""
@@ -1,10 +1,10 @@
-import asyncio
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator
 from datetime import datetime
 from bson import ObjectId
 
-import google.generativeai as genai
+from app.core import course_cache
+from app.core.gemini import get_gemini_model
 from app.core.mongodb import get_database
 from app.core.config import settings
 
@@ -32,8 +32,7 @@ class AssetSummaryService:
             if not api_key:
                 raise Exception("Google API key not configured in settings")
             
-            genai.configure(api_key=api_key)
-            self._gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            self._gemini_model = get_gemini_model()
             print("✅ Gemini API initialized successfully for asset summary generation")
         except Exception as e:
             print(f"❌ Error initializing Gemini API for asset summary: {e}")
@@ -71,10 +70,7 @@ SUMMARY:"""
         
         try:
             prompt = self._create_summary_prompt(content)
-            response = await asyncio.to_thread(
-                self._gemini_model.generate_content, 
-                prompt
-            )
+            response = await self._gemini_model.generate_content_async(prompt)
             
             if response and response.text:
                 summary = response.text.strip()
@@ -89,10 +85,50 @@ SUMMARY:"""
             print(f"❌ Error generating summary: {e}")
             raise Exception(f"Summary generation failed: {str(e)}")
 
+    async def stream_summary(self, asset_id: str) -> AsyncIterator[str]:
+        """Stream summary text chunks from Gemini as they arrive, then store the full summary"""
+        if not self._gemini_model:
+            raise Exception("Gemini API not initialized")
+        
+        asset = await self.get_asset_by_id(asset_id)
+        if not asset:
+            raise Exception(f"Asset with ID '{asset_id}' not found")
+        
+        content = asset.get("content", "")
+        if not content or content.isspace():
+            raise Exception("Asset has no content to summarize")
+        
+        prompt = self._create_summary_prompt(content)
+        response = await self._gemini_model.generate_content_async(prompt, stream=True)
+        
+        parts = []
+        async for chunk in response:
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+        
+        summary = ' '.join(''.join(parts).split())
+        if not summary:
+            raise Exception("No summary received from Gemini API")
+        await self.update_asset_summary(asset_id, summary)
+
+    async def verify_indexes(self) -> bool:
+        """Check that the primary-key index used by the asset lookups exists"""
+        try:
+            indexes = await self.assets_collection.index_information()
+            if "_id_" not in indexes:
+                print("❌ Assets collection is missing the _id_ index; asset lookups will be slow")
+                return False
+            return True
+        except Exception as e:
+            print(f"❌ Error checking asset indexes: {e}")
+            return False
+
     async def get_asset_by_id(self, asset_id: str) -> Optional[Dict[str, Any]]:
         """Get asset by ID"""
         try:
-            asset = await self.assets_collection.find_one({"_id": ObjectId(asset_id)})
+            asset = await self.assets_collection.find_one({"_id": ObjectId(asset_id)}, hint="_id_")
             if asset:
                 asset["_id"] = str(asset["_id"])
                 # Convert ObjectId fields to strings
@@ -103,6 +139,45 @@ SUMMARY:"""
             print(f"❌ Error getting asset: {e}")
             return None
 
+    async def get_asset_summary_fields(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get only the summary fields of an asset.
+        Returns None only when the asset does not exist; database errors are raised
+        so callers do not mistake an outage for a missing asset.
+        """
+        try:
+            asset = await self.assets_collection.find_one(
+                {"_id": ObjectId(asset_id)},
+                {"summary": 1, "summary_updated_at": 1},
+                hint="_id_"
+            )
+        except Exception as e:
+            print(f"❌ Error getting asset summary fields: {e}")
+            raise
+        if asset:
+            asset["_id"] = str(asset["_id"])
+        return asset
+
+    async def get_asset_summary_fields_many(self, asset_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the summary fields of several assets in one query, keyed by asset ID.
+        Assets that do not exist are absent from the result; database errors are raised
+        so a failed query is not reported as every asset missing.
+        """
+        try:
+            cursor = self.assets_collection.find(
+                {"_id": {"$in": [ObjectId(asset_id) for asset_id in asset_ids]}},
+                {"summary": 1, "summary_updated_at": 1}
+            )
+            assets = {}
+            async for asset in cursor:
+                asset["_id"] = str(asset["_id"])
+                assets[asset["_id"]] = asset
+            return assets
+        except Exception as e:
+            print(f"❌ Error getting asset summary fields: {e}")
+            raise
+
     async def update_asset_summary(self, asset_id: str, summary: str) -> Optional[Dict[str, Any]]:
         """Update asset with generated summary"""
         try:
@@ -115,6 +190,7 @@ SUMMARY:"""
                     }
                 }
             )
+            course_cache.invalidate()
             
             if result.modified_count > 0:
                 # Return updated asset
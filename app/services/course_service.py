@@ -113,22 +113,32 @@ class CourseService:
                 return None
 
             # Get user asset status for this course
-            user_status_cursor = self.user_asset_status_collection.find({
-                "user": user_id,
-                "course": course_id
-            })
+            user_status_cursor = self.user_asset_status_collection.find(
+                {"user": user_id, "course": course_id},
+                {"_id": 0, "asset": 1, "status": 1}
+            )
             user_statuses = {}
             async for status in user_status_cursor:
                 user_statuses[status.get("asset")] = status.get("status", "not-started")
 
+            # Fetch every asset referenced by the course's modules in one query
+            modules = course.get("modules", [])
+            asset_oids = {ObjectId(asset_id) for module in modules for asset_id in module.get("assets", [])}
+            assets_by_id = {}
+            if asset_oids:
+                async for asset in self.assets_collection.find({"_id": {"$in": list(asset_oids)}}):
+                    assets_by_id[str(asset["_id"])] = asset
+
             # Populate assets for each module with user progress
-            for module in course.get("modules", []):
+            for module in modules:
                 asset_ids = module.get("assets", [])
                 assets = []
                 
                 for asset_id in asset_ids:
-                    asset = await self.assets_collection.find_one({"_id": ObjectId(asset_id)})
+                    asset = assets_by_id.get(str(asset_id))
                     if asset:
+                        # Copy so an asset listed in several modules is converted independently
+                        asset = dict(asset)
                         asset["_id"] = str(asset["_id"])
                         # Convert ObjectId fields to strings
                         if isinstance(asset.get("code"), ObjectId):
@@ -160,8 +170,9 @@ class CourseService:
         """Create a new course"""
         try:
             course_dict = course_data.dict()
-            course_dict["created_at"] = datetime.utcnow()
-            course_dict["updated_at"] = datetime.utcnow()
+            now = datetime.utcnow()
+            course_dict["created_at"] = now
+            course_dict["updated_at"] = now
             
             result = await self.courses_collection.insert_one(course_dict)
             course_dict["_id"] = str(result.inserted_id)
@@ -181,6 +192,18 @@ class CourseService:
             print(f"Error creating asset: {e}")
             raise e
 
+    async def create_assets_bulk(self, assets_data: List[AssetCreate]) -> List[Dict[str, Any]]:
+        """Create several assets with a single unordered insert_many"""
+        try:
+            asset_dicts = [asset_data.dict() for asset_data in assets_data]
+            result = await self.assets_collection.insert_many(asset_dicts, ordered=False)
+            for asset_dict, inserted_id in zip(asset_dicts, result.inserted_ids):
+                asset_dict["_id"] = str(inserted_id)
+            return asset_dicts
+        except Exception as e:
+            print(f"Error creating assets: {e}")
+            raise e
+
     async def update_course(self, course_id: str, course_data: CourseUpdate) -> Optional[Dict[str, Any]]:
         """Update a course"""
         try:
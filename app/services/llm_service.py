@@ -5,15 +5,19 @@ Supports multiple LLM providers and flexible content generation.
 
 import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from enum import Enum
 from pydantic import BaseModel, Field
 import asyncio
 import google.generativeai as genai
+from app.core.gemini import get_gemini_model
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Caps provider calls from generate_batch across all concurrent batch requests
+_batch_semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+
 
 class ResultType(str, Enum):
     """Supported result types for LLM generation."""
@@ -220,6 +224,19 @@ Content: {content}
 """
     }
 
+    # Default values for the common template parameters
+    DEFAULT_PARAMS = {
+        'num_questions': 5,
+        'num_options': 4,
+        'difficulty': 'medium',
+        'style': 'clear and engaging',
+        'audience': 'general learners',
+        'length': 'medium',
+        'language': 'Python',
+        'custom_prompt': '',
+        'additional_instructions': ''
+    }
+
     @classmethod
     def get_prompt(cls, result_type: ResultType, content: str, **kwargs) -> str:
         """Get formatted prompt for the specified result type."""
@@ -227,22 +244,7 @@ Content: {content}
         if not template:
             raise ValueError(f"No template found for result type: {result_type}")
         
-        # Set default values for common parameters
-        params = {
-            'content': content,
-            'num_questions': kwargs.get('num_questions', 5),
-            'num_options': kwargs.get('num_options', 4),
-            'difficulty': kwargs.get('difficulty', 'medium'),
-            'style': kwargs.get('style', 'clear and engaging'),
-            'audience': kwargs.get('audience', 'general learners'),
-            'length': kwargs.get('length', 'medium'),
-            'language': kwargs.get('language', 'Python'),
-            'custom_prompt': kwargs.get('custom_prompt', ''),
-            'additional_instructions': kwargs.get('additional_instructions', ''),
-            **kwargs
-        }
-        
-        return template.format(**params)
+        return template.format_map({**cls.DEFAULT_PARAMS, 'content': content, **kwargs})
 
 
 class LLMService:
@@ -258,8 +260,7 @@ class LLMService:
         try:
             # Setup Google Gemini
             if hasattr(settings, 'google_api_key') and settings.google_api_key:
-                genai.configure(api_key=settings.google_api_key)
-                self.google_client = genai.GenerativeModel('gemini-1.5-flash')
+                self.google_client = get_gemini_model()
             else:
                 logger.warning("Google API key not configured")
             
@@ -322,6 +323,50 @@ class LLMService:
                 error_message=str(e)
             )
     
+    async def generate_content_stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """
+        Stream generated text chunks as the provider yields them.
+        Only Google Gemini supports streaming; parse the joined text with parse_text once the stream ends.
+        """
+        if request.provider != LLMProvider.GOOGLE:
+            raise ValueError(f"Streaming is not supported for provider: {request.provider.value}")
+        if not self.google_client:
+            raise ValueError("Google client not initialized")
+        
+        prompt = PromptTemplate.get_prompt(
+            request.result_type,
+            request.content,
+            **request.additional_params
+        )
+        generation_config = genai.types.GenerationConfig(
+            max_output_tokens=request.max_tokens,
+            temperature=request.temperature,
+        )
+        
+        response = await self.google_client.generate_content_async(
+            prompt,
+            generation_config=generation_config,
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    def parse_text(self, text: str, result_type: ResultType) -> Union[Dict[str, Any], str, List[Dict[str, Any]]]:
+        """Parse generated text the same way as a buffered response of the given result type."""
+        return self._parse_response(text, result_type)
+    
+    async def generate_batch(self, requests: List[LLMRequest]) -> List[LLMResponse]:
+        """
+        Generate content for several requests concurrently, returning responses in request order.
+        Calls from all batches share one gemini_max_concurrency cap so concurrent batches do not flood the provider.
+        """
+        async def generate(request: LLMRequest) -> LLMResponse:
+            async with _batch_semaphore:
+                return await self.generate_content(request)
+        
+        return await asyncio.gather(*(generate(request) for request in requests))
+    
     async def _generate_google(self, prompt: str, request: LLMRequest) -> Any:
         """Generate content using Google Gemini API."""
         if not self.google_client:
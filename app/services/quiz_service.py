@@ -2,15 +2,21 @@
 Quiz service for generating and managing quizzes based on course content.
 """
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
+from app.core.config import settings
 from app.models.quiz import Quiz, QuizAttempt
 from app.schemas.quiz import QuizCreate, QuizUpdate, QuizGenerationRequest, CourseModuleInfo
 from app.services.llm_service import llm_service, LLMRequest, ResultType, LLMProvider
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
 import json
 
 logger = logging.getLogger(__name__)
@@ -19,41 +25,59 @@ logger = logging.getLogger(__name__)
 class QuizService:
     """Service for quiz operations and generation."""
     
+    # Fields of a stored course_quiz_stats document returned by get_course_quiz_stats
+    _STATS_FIELDS = (
+        "total_quizzes", "total_questions", "difficulty_distribution", "modules_with_quizzes", "last_generated"
+    )
+    # Fields of a quiz document that feed its course's stats
+    _STATS_PROJECTION = {
+        "course_id": 1, "module_code": 1, "difficulty": 1, "total_questions": 1,
+        "is_active": 1, "is_deleted": 1, "created_at": 1
+    }
+    
     def __init__(self):
         self.llm_service = llm_service
+        # Module counts per course, polled by the generation status endpoint
+        self._modules_cache = TTLCache(maxsize=1_024, ttl=settings.course_cache_ttl)
+        self._modules_inflight = SingleFlight()
+        # Bumped by invalidate_course_modules so a count read before a course change is not cached
+        self._modules_generation = 0
+    
+    @staticmethod
+    def _build_quiz_doc(quiz_data: QuizCreate) -> Dict[str, Any]:
+        """Build the MongoDB document for a new quiz."""
+        # Convert questions to dictionaries for MongoDB storage
+        questions_dict = []
+        for question in quiz_data.questions:
+            if hasattr(question, 'dict'):
+                questions_dict.append(question.dict())
+            else:
+                questions_dict.append(question)
+        
+        now = datetime.utcnow()
+        return {
+            "_id": ObjectId(),
+            "course_id": quiz_data.course_id,
+            "module_code": quiz_data.module_code,
+            "title": quiz_data.title,
+            "description": quiz_data.description,
+            "difficulty": quiz_data.difficulty,
+            "questions": questions_dict,
+            "total_questions": len(quiz_data.questions),
+            "estimated_time_minutes": quiz_data.estimated_time_minutes,
+            "is_active": True,
+            "is_deleted": False,
+            "generated_by_ai": True,
+            "created_at": now,
+            "updated_at": now
+        }
     
     # CRUD Operations
     async def create_quiz(self, db: AsyncIOMotorDatabase, quiz_data: QuizCreate) -> Quiz:
         """Create a new quiz in MongoDB."""
         try:
-            # Calculate total questions
-            total_questions = len(quiz_data.questions)
-            
-            # Convert questions to dictionaries for MongoDB storage
-            questions_dict = []
-            for question in quiz_data.questions:
-                if hasattr(question, 'dict'):
-                    questions_dict.append(question.dict())
-                else:
-                    questions_dict.append(question)
-            
             # Create quiz document
-            quiz_doc = {
-                "_id": ObjectId(),
-                "course_id": quiz_data.course_id,
-                "module_code": quiz_data.module_code,
-                "title": quiz_data.title,
-                "description": quiz_data.description,
-                "difficulty": quiz_data.difficulty,
-                "questions": questions_dict,
-                "total_questions": total_questions,
-                "estimated_time_minutes": quiz_data.estimated_time_minutes,
-                "is_active": True,
-                "is_deleted": False,
-                "generated_by_ai": True,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
+            quiz_doc = self._build_quiz_doc(quiz_data)
             
             # Insert into MongoDB
             result = await db.quizzes.insert_one(quiz_doc)
@@ -63,12 +87,31 @@ class QuizService:
             quiz = Quiz.from_mongo_dict(quiz_doc)
             
             logger.info(f"Created quiz: {quiz.id} for course: {quiz.course_id}")
+            await self._apply_quiz_stats_change(db, quiz.course_id, added=[quiz_doc])
             return quiz
             
         except Exception as e:
             logger.error(f"Error creating quiz: {e}")
             raise
     
+    async def create_quizzes(self, db: AsyncIOMotorDatabase, quizzes_data: List[QuizCreate]) -> List[Quiz]:
+        """Create several quizzes with a single unordered insert_many; _ids are assigned up front, so nothing is re-read."""
+        try:
+            quiz_docs = [self._build_quiz_doc(quiz_data) for quiz_data in quizzes_data]
+            await db.quizzes.insert_many(quiz_docs, ordered=False)
+            
+            quizzes = [Quiz.from_mongo_dict(quiz_doc) for quiz_doc in quiz_docs]
+            logger.info(f"Created {len(quizzes)} quizzes for course: {quizzes_data[0].course_id}")
+            for course_id in {quiz_doc["course_id"] for quiz_doc in quiz_docs}:
+                await self._apply_quiz_stats_change(
+                    db, course_id, added=[quiz_doc for quiz_doc in quiz_docs if quiz_doc["course_id"] == course_id]
+                )
+            return quizzes
+            
+        except Exception as e:
+            logger.error(f"Error creating quizzes: {e}")
+            raise
+    
     async def get_quiz(self, db: AsyncIOMotorDatabase, quiz_id: str) -> Optional[Quiz]:
         """Get quiz by ID from MongoDB."""
         try:
@@ -97,6 +140,239 @@ class QuizService:
             logger.error(f"Error getting quizzes for course {course_id}: {e}")
             return []
     
+    async def get_quizzes_by_course_paged(
+        self,
+        db: AsyncIOMotorDatabase,
+        course_id: str,
+        module_code: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Tuple[List[Quiz], int]:
+        """Get one page of a course's quizzes, newest first, along with the total count."""
+        query = {"course_id": course_id, "is_active": True, "is_deleted": False}
+        if module_code:
+            query["module_code"] = module_code
+        
+        try:
+            quiz_docs, total = await asyncio.gather(
+                db.quizzes.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit),
+                db.quizzes.count_documents(query)
+            )
+        except Exception as e:
+            logger.error(f"Error getting quizzes for course {course_id}: {e}")
+            raise
+        
+        return [Quiz.from_mongo_dict(doc) for doc in quiz_docs], total
+    
+    async def get_module_codes_with_quizzes(self, db: AsyncIOMotorDatabase, course_id: str) -> Set[str]:
+        """Get the codes of the modules of a course that have an active quiz."""
+        module_codes = await db.quizzes.distinct(
+            "module_code",
+            {"course_id": course_id, "is_active": True, "is_deleted": False}
+        )
+        return {code for code in module_codes if code}
+    
+    async def count_modules_with_quizzes(self, db: AsyncIOMotorDatabase, course_id: str) -> int:
+        """Count the distinct modules of a course that have an active quiz."""
+        return len(await self.get_module_codes_with_quizzes(db, course_id))
+    
+    async def has_quizzes(self, db: AsyncIOMotorDatabase, course_id: str, module_code: str) -> bool:
+        """Check whether a module has an active quiz without loading any quiz document."""
+        quiz_doc = await db.quizzes.find_one(
+            {"course_id": course_id, "module_code": module_code, "is_active": True, "is_deleted": False},
+            {"_id": 1}
+        )
+        return quiz_doc is not None
+    
+    async def count_course_modules(self, db: AsyncIOMotorDatabase, course_id: str) -> int:
+        """Count a course's modules, reading only their codes; counts are cached per course."""
+        count = self._modules_cache.get(course_id)
+        if count is not None:
+            return count
+        
+        async def load():
+            if not ObjectId.is_valid(course_id):
+                return 0
+            course = await db.courses.find_one({"_id": ObjectId(course_id)}, {"modules.code": 1})
+            return len(course.get("modules", [])) if course else 0
+        
+        generation = self._modules_generation
+        count = await self._modules_inflight.do((course_id, generation), load)
+        if generation == self._modules_generation:
+            self._modules_cache.set(course_id, count)
+        return count
+    
+    def invalidate_course_modules(self, course_id: str) -> None:
+        """Drop the cached module count for a course after it changes."""
+        self._modules_generation += 1
+        self._modules_cache.pop(course_id)
+    
+    async def get_last_generated_at(self, db: AsyncIOMotorDatabase, course_id: str) -> Optional[datetime]:
+        """Get the creation time of the newest active quiz for a course."""
+        quiz_doc = await db.quizzes.find_one(
+            {"course_id": course_id, "is_active": True, "is_deleted": False},
+            {"created_at": 1},
+            sort=[("created_at", -1)]
+        )
+        return quiz_doc.get("created_at") if quiz_doc else None
+    
+    async def get_course_quiz_stats(self, db: AsyncIOMotorDatabase, course_id: str) -> Dict[str, Any]:
+        """
+        Get a course's stored quiz stats. Quiz writes adjust them in place; they are rebuilt from
+        scratch when missing, when only a write's partial counts are stored, or once they are older
+        than quiz_stats_rebuild_interval, so any drift from racing writes is repaired.
+        """
+        stored = await db.course_quiz_stats.find_one({"_id": course_id}, {"_id": 0})
+        rebuilt_at = stored.get("rebuilt_at") if stored else None
+        if rebuilt_at is None or rebuilt_at < datetime.utcnow() - timedelta(seconds=settings.quiz_stats_rebuild_interval):
+            stats = await self.refresh_course_quiz_stats(db, course_id, stored)
+        else:
+            stats = {field: stored.get(field) for field in self._STATS_FIELDS}
+        # Incremental updates leave zero counts behind for difficulties with no quizzes left
+        stats["difficulty_distribution"] = {
+            difficulty: count for difficulty, count in stats.get("difficulty_distribution", {}).items() if count
+        }
+        return stats
+    
+    async def _compute_course_quiz_stats(self, db: AsyncIOMotorDatabase, course_id: str) -> Dict[str, Any]:
+        """Compute the stored form of a course's quiz stats from its quizzes."""
+        aggregates = await self.get_course_quiz_aggregates(db, course_id)
+        return {
+            "total_quizzes": aggregates["total_quizzes"],
+            "total_questions": aggregates["total_questions"],
+            "difficulty_distribution": aggregates["difficulty_distribution"],
+            "modules_with_quizzes": len(aggregates["module_codes"]),
+            "last_generated": aggregates["last_generated"]
+        }
+    
+    @staticmethod
+    def _counts_in_stats(quiz_doc: Dict[str, Any]) -> bool:
+        """Whether a quiz document is part of its course's stats (active and not deleted)."""
+        return quiz_doc.get("is_active", True) and not quiz_doc.get("is_deleted", False)
+    
+    async def _apply_quiz_stats_change(
+        self,
+        db: AsyncIOMotorDatabase,
+        course_id: Optional[str],
+        added: Optional[List[Dict[str, Any]]] = None,
+        removed: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Adjust a course's stored quiz stats with $inc after quizzes joined or left its active set.
+        Each write bumps the stored version, so a rebuild that raced it is not stored; without stored
+        stats the write leaves partial counts, which the next read replaces with a rebuild.
+        Failures are logged rather than raised so they never fail the write itself.
+        """
+        added = added or []
+        removed = removed or []
+        if not course_id or not (added or removed):
+            return
+        try:
+            inc = {"total_quizzes": len(added) - len(removed), "total_questions": 0, "modules_with_quizzes": 0}
+            module_changes: Dict[str, int] = {}
+            for sign, quiz_docs in ((1, added), (-1, removed)):
+                for quiz_doc in quiz_docs:
+                    inc["total_questions"] += sign * quiz_doc.get("total_questions", 0)
+                    difficulty_field = f"difficulty_distribution.{quiz_doc.get('difficulty') or 'medium'}"
+                    inc[difficulty_field] = inc.get(difficulty_field, 0) + sign
+                    if quiz_doc.get("module_code"):
+                        module_changes[quiz_doc["module_code"]] = module_changes.get(quiz_doc["module_code"], 0) + sign
+            
+            # A module counts once however many quizzes it has, so compare its active quizzes before and after
+            for module_code, change in module_changes.items():
+                if change == 0:
+                    continue
+                active_now = await db.quizzes.count_documents(
+                    {"course_id": course_id, "module_code": module_code, "is_active": True, "is_deleted": False}
+                )
+                inc["modules_with_quizzes"] += int(active_now > 0) - int(active_now - change > 0)
+            
+            update = {"$inc": {**inc, "version": 1}, "$set": {"updated_at": datetime.utcnow()}}
+            if removed:
+                # The newest quiz may be gone, so look the latest one up again
+                update["$set"]["last_generated"] = await self.get_last_generated_at(db, course_id)
+            else:
+                update["$max"] = {"last_generated": max(quiz_doc["created_at"] for quiz_doc in added)}
+            await db.course_quiz_stats.update_one({"_id": course_id}, update, upsert=True)
+        except Exception as e:
+            logger.error(f"Error updating quiz stats for course {course_id}: {e}")
+            try:
+                # Drop the stored stats so the next read rebuilds them instead of serving wrong numbers
+                await db.course_quiz_stats.delete_one({"_id": course_id})
+            except Exception:
+                pass
+    
+    async def refresh_course_quiz_stats(
+        self,
+        db: AsyncIOMotorDatabase,
+        course_id: str,
+        stored: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a course's quiz stats with a full aggregation over its quizzes and return them.
+        ``stored`` is the stats document read beforehand (None if there was none). The rebuild is only
+        stored if no quiz write has changed that document since, so a write racing the aggregation is
+        never overwritten; the next read rebuilds again instead.
+        """
+        stats = await self._compute_course_quiz_stats(db, course_id)
+        now = datetime.utcnow()
+        try:
+            if stored is None:
+                await db.course_quiz_stats.insert_one(
+                    {"_id": course_id, **stats, "version": 0, "rebuilt_at": now, "updated_at": now}
+                )
+            else:
+                await db.course_quiz_stats.replace_one(
+                    {"_id": course_id, "version": stored.get("version")},
+                    {**stats, "version": stored.get("version") or 0, "rebuilt_at": now, "updated_at": now}
+                )
+        except DuplicateKeyError:
+            # A quiz write stored its counts while the aggregation ran
+            pass
+        except Exception as e:
+            logger.error(f"Error storing rebuilt quiz stats for course {course_id}: {e}")
+        return stats
+    
+    async def get_course_quiz_aggregates(self, db: AsyncIOMotorDatabase, course_id: str) -> Dict[str, Any]:
+        """
+        Aggregate quiz counts for a course in MongoDB instead of loading every quiz.
+        Returns total_quizzes, total_questions, module_codes, last_generated and difficulty_distribution.
+        """
+        pipeline = [
+            {"$match": {"course_id": course_id, "is_active": True, "is_deleted": False}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "total_quizzes": {"$sum": 1},
+                        "total_questions": {"$sum": "$total_questions"},
+                        "module_codes": {"$addToSet": "$module_code"},
+                        "last_generated": {"$max": "$created_at"}
+                    }}
+                ],
+                "difficulty": [
+                    {"$group": {"_id": {"$ifNull": ["$difficulty", "medium"]}, "count": {"$sum": 1}}}
+                ]
+            }}
+        ]
+        try:
+            result = await db.quizzes.aggregate(pipeline).to_list(length=1)
+        except Exception as e:
+            logger.error(f"Error aggregating quizzes for course {course_id}: {e}")
+            raise
+        
+        facets = result[0] if result else {}
+        totals = facets.get("totals") or [{}]
+        return {
+            "total_quizzes": totals[0].get("total_quizzes", 0),
+            "total_questions": totals[0].get("total_questions", 0),
+            "module_codes": [code for code in totals[0].get("module_codes", []) if code],
+            "last_generated": totals[0].get("last_generated"),
+            "difficulty_distribution": {
+                row["_id"] or "medium": row["count"] for row in facets.get("difficulty", [])
+            }
+        }
+    
     async def update_quiz(self, db: AsyncIOMotorDatabase, quiz_id: str, quiz_update: QuizUpdate) -> Optional[Quiz]:
         """Update an existing quiz in MongoDB."""
         try:
@@ -117,19 +393,26 @@ class QuizService:
             # Add updated timestamp
             update_data['updated_at'] = datetime.utcnow()
             
-            # Update in MongoDB
-            result = await db.quizzes.update_one(
+            # Update in MongoDB, keeping the previous version to work out the stats change
+            previous_doc = await db.quizzes.find_one_and_update(
                 {"_id": ObjectId(quiz_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.matched_count == 0:
+            if previous_doc is None:
                 return None
             
-            # Return updated quiz
-            updated_quiz = await self.get_quiz(db, quiz_id)
+            updated_doc = {**previous_doc, **update_data}
             logger.info(f"Updated quiz: {quiz_id}")
-            return updated_quiz
+            if update_data.keys() & {"difficulty", "total_questions", "is_active"}:
+                await self._apply_quiz_stats_change(
+                    db,
+                    updated_doc.get("course_id"),
+                    added=[updated_doc] if self._counts_in_stats(updated_doc) else [],
+                    removed=[previous_doc] if self._counts_in_stats(previous_doc) else []
+                )
+            return Quiz.from_mongo_dict(updated_doc)
             
         except Exception as e:
             logger.error(f"Error updating quiz {quiz_id}: {e}")
@@ -138,15 +421,18 @@ class QuizService:
     async def delete_quiz(self, db: AsyncIOMotorDatabase, quiz_id: str) -> bool:
         """Soft delete a quiz in MongoDB by marking as deleted."""
         try:
-            result = await db.quizzes.update_one(
+            quiz_doc = await db.quizzes.find_one_and_update(
                 {"_id": ObjectId(quiz_id)},
-                {"$set": {"is_deleted": True, "is_active": False, "updated_at": datetime.utcnow()}}
+                {"$set": {"is_deleted": True, "is_active": False, "updated_at": datetime.utcnow()}},
+                projection=self._STATS_PROJECTION
             )
             
-            if result.matched_count == 0:
+            if quiz_doc is None:
                 return False
             
             logger.info(f"Soft deleted quiz: {quiz_id}")
+            if self._counts_in_stats(quiz_doc):
+                await self._apply_quiz_stats_change(db, quiz_doc.get("course_id"), removed=[quiz_doc])
             return True
             
         except Exception as e:
@@ -156,12 +442,22 @@ class QuizService:
     async def mark_existing_quizzes_as_deleted(self, db: AsyncIOMotorDatabase, course_id: str, module_code: str) -> int:
         """Mark all existing quizzes for a course/module as deleted during overwrite."""
         try:
-            result = await db.quizzes.update_many(
+            quiz_docs = await db.quizzes.find(
                 {
                     "course_id": course_id,
                     "module_code": module_code,
                     "is_deleted": False
                 },
+                self._STATS_PROJECTION
+            ).to_list(length=None)
+            if not quiz_docs:
+                return 0
+            
+            result = await db.quizzes.update_many(
+                {
+                    "_id": {"$in": [quiz_doc["_id"] for quiz_doc in quiz_docs]},
+                    "is_deleted": False
+                },
                 {
                     "$set": {
                         "is_deleted": True,
@@ -174,6 +470,9 @@ class QuizService:
             deleted_count = result.modified_count
             if deleted_count > 0:
                 logger.info(f"Marked {deleted_count} existing quizzes as deleted for course: {course_id}, module: {module_code}")
+                await self._apply_quiz_stats_change(
+                    db, course_id, removed=[quiz_doc for quiz_doc in quiz_docs if self._counts_in_stats(quiz_doc)]
+                )
             
             return deleted_count
             
@@ -194,53 +493,73 @@ class QuizService:
     ) -> Optional[Quiz]:
         """Generate a quiz for a specific module."""
         try:
-            # Prepare content for LLM
-            content = f"Module: {module_title}\n\nContent:\n{module_content}"
-            
-            # Create LLM request
-            llm_request = LLMRequest(
-                content=content,
-                result_type=ResultType.QUIZ_MCQ,
-                additional_params={
-                    "num_questions": num_questions,
-                    "difficulty": difficulty,
-                    "num_options": 4
-                },
-                provider=LLMProvider.GOOGLE,
-                max_tokens=2000,
-                temperature=0.7
-            )
+            llm_request = self._module_quiz_request(module_content, module_title, num_questions, difficulty)
             
             # Generate quiz using LLM
             response = await self.llm_service.generate_content(llm_request)
             
-            if not response.success:
-                logger.error(f"LLM generation failed: {response.error_message}")
+            quiz_create = self._quiz_from_response(response, course_id, module_code, module_title, difficulty)
+            if quiz_create is None:
                 return None
             
-            # Extract quiz data
-            quiz_data = response.result
-            if isinstance(quiz_data, dict) and 'questions' in quiz_data:
-                # Create quiz
-                quiz_create = QuizCreate(
-                    course_id=course_id,
-                    module_code=module_code,
-                    title=quiz_data.get('title', f"Quiz: {module_title}"),
-                    description=f"Auto-generated quiz for module: {module_title}",
-                    difficulty=difficulty,
-                    questions=quiz_data['questions'],
-                    estimated_time_minutes=len(quiz_data['questions']) * 2  # 2 minutes per question
-                )
-                
-                return await self.create_quiz(db, quiz_create)
-            else:
-                logger.error(f"Invalid quiz format received from LLM: {quiz_data}")
-                return None
+            return await self.create_quiz(db, quiz_create)
                 
         except Exception as e:
             logger.error(f"Error generating quiz for module {module_code}: {e}")
             return None
     
+    @staticmethod
+    def _module_quiz_request(module_content: str, module_title: str, num_questions: int, difficulty: str) -> LLMRequest:
+        """Build the LLM request that generates a module's quiz."""
+        # Prepare content for LLM
+        content = f"Module: {module_title}\n\nContent:\n{module_content}"
+        
+        return LLMRequest(
+            content=content,
+            result_type=ResultType.QUIZ_MCQ,
+            additional_params={
+                "num_questions": num_questions,
+                "difficulty": difficulty,
+                "num_options": 4
+            },
+            provider=LLMProvider.GOOGLE,
+            max_tokens=2000,
+            temperature=0.7
+        )
+    
+    @staticmethod
+    def _quiz_from_response(
+        response,
+        course_id: str,
+        module_code: str,
+        module_title: str,
+        difficulty: str
+    ) -> Optional[QuizCreate]:
+        """Turn an LLM quiz response into a QuizCreate, or None if generation failed."""
+        if not response.success:
+            logger.error(f"LLM generation failed: {response.error_message}")
+            return None
+        
+        # Extract quiz data
+        quiz_data = response.result
+        if not (isinstance(quiz_data, dict) and 'questions' in quiz_data):
+            logger.error(f"Invalid quiz format received from LLM: {quiz_data}")
+            return None
+        
+        try:
+            return QuizCreate(
+                course_id=course_id,
+                module_code=module_code,
+                title=quiz_data.get('title', f"Quiz: {module_title}"),
+                description=f"Auto-generated quiz for module: {module_title}",
+                difficulty=difficulty,
+                questions=quiz_data['questions'],
+                estimated_time_minutes=len(quiz_data['questions']) * 2  # 2 minutes per question
+            )
+        except ValueError as e:
+            logger.error(f"Invalid quiz received from LLM for module {module_code}: {e}")
+            return None
+    
     async def generate_quizzes_for_course(
         self, 
         db: AsyncIOMotorDatabase, 
@@ -295,9 +614,7 @@ class QuizService:
         """Generate quiz for a single module."""
         try:
             # Check if quiz already exists
-            existing_quiz = await self.get_quizzes_by_course(
-                db, request.course_id, request.module_code
-            )
+            existing_quiz = await self.has_quizzes(db, request.course_id, request.module_code)
             
             if existing_quiz and not request.overwrite:
                 result["skipped_modules"].append(request.module_code)
@@ -348,15 +665,15 @@ class QuizService:
         try:
             generated_count = 0
             skipped_count = 0
+            pending_modules = []
+            module_codes_with_quizzes = await self.get_module_codes_with_quizzes(db, request.course_id)
             
             for module_info in modules_info:
                 if not module_info.module_code:
                     continue
                 
                 # Check if quiz already exists
-                existing_quiz = await self.get_quizzes_by_course(
-                    db, request.course_id, module_info.module_code
-                )
+                existing_quiz = module_info.module_code in module_codes_with_quizzes
                 
                 if existing_quiz and not request.overwrite:
                     result["skipped_modules"].append(module_info.module_code)
@@ -370,22 +687,32 @@ class QuizService:
                     )
                     logger.info(f"Marked {deleted_count} existing quizzes as deleted for module {module_info.module_code}")
                 
-                # Generate new quiz
-                quiz = await self.generate_quiz_for_module(
-                    db=db,
-                    course_id=request.course_id,
-                    module_code=module_info.module_code,
-                    module_content=module_info.assets_content or "",
-                    module_title=module_info.module_title or f"Module {module_info.module_code}",
-                    num_questions=request.num_questions,
-                    difficulty=request.difficulty
+                pending_modules.append(
+                    (module_info, module_info.module_title or f"Module {module_info.module_code}")
                 )
-                
-                if quiz:
+            
+            # Generate every module's quiz concurrently, then store them with one insert
+            responses = await self.llm_service.generate_batch([
+                self._module_quiz_request(
+                    module_info.assets_content or "", module_title, request.num_questions, request.difficulty
+                )
+                for module_info, module_title in pending_modules
+            ])
+            
+            quiz_creates = []
+            for (module_info, module_title), response in zip(pending_modules, responses):
+                quiz_create = self._quiz_from_response(
+                    response, request.course_id, module_info.module_code, module_title, request.difficulty
+                )
+                if quiz_create is None:
+                    result["errors"].append(f"Failed to generate quiz for module {module_info.module_code}")
+                else:
+                    quiz_creates.append(quiz_create)
+            
+            if quiz_creates:
+                for quiz in await self.create_quizzes(db, quiz_creates):
                     result["generated_quizzes"].append(quiz.to_dict())
                     generated_count += 1
-                else:
-                    result["errors"].append(f"Failed to generate quiz for module {module_info.module_code}")
             
             # Set result message
             if generated_count > 0:
@@ -447,9 +774,12 @@ class QuizService:
                         assets_content=assets_content
                     ))
             else:
-                # Get all modules
-                for module in modules:
-                    assets_content = await self._get_module_assets_content(db, module.get("assets", []))
+                # Get all modules, loading each module's asset content concurrently
+                modules_content = await asyncio.gather(*(
+                    self._get_module_assets_content(db, module.get("assets", []))
+                    for module in modules
+                ))
+                for module, assets_content in zip(modules, modules_content):
                     result.append(CourseModuleInfo(
                         course_id=course_id,
                         course_title=course_title,
@@ -588,6 +918,7 @@ class QuizService:
             # Calculate percentage
             percentage = int((score / max_score) * 100) if max_score > 0 else 0
             
+            now = datetime.utcnow()
             # Create attempt document
             attempt_doc = {
                 "_id": ObjectId(),
@@ -598,8 +929,8 @@ class QuizService:
                 "score": score,
                 "max_score": max_score,
                 "percentage": percentage,
-                "started_at": datetime.utcnow(),
-                "completed_at": datetime.utcnow(),
+                "started_at": now,
+                "completed_at": now,
                 "is_completed": True
             }
             
@@ -617,6 +948,29 @@ class QuizService:
             logger.error(f"Error creating quiz attempt: {e}")
             raise
     
+    async def get_idempotent_attempt(self, db: AsyncIOMotorDatabase, key: str, since: datetime) -> Optional[Dict[str, Any]]:
+        """Get the stored response of an attempt submitted under ``key`` no earlier than ``since``."""
+        record = await db.quiz_attempt_idempotency.find_one(
+            {"_id": key, "created_at": {"$gte": since}},
+            {"response": 1}
+        )
+        return record["response"] if record else None
+    
+    async def save_idempotent_attempt(self, db: AsyncIOMotorDatabase, key: str, attempt_id: str, response: Dict[str, Any]) -> None:
+        """
+        Store an attempt's response under ``key`` so a replayed submission can return it.
+        The attempt is already recorded by then, so failures are logged rather than raised; a 500
+        would only make the client retry and record the attempt a second time.
+        """
+        try:
+            await db.quiz_attempt_idempotency.replace_one(
+                {"_id": key},
+                {"attempt_id": attempt_id, "response": response, "created_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error saving idempotency record for quiz attempt {attempt_id}: {e}")
+    
     async def get_user_quiz_attempts(self, db: AsyncIOMotorDatabase, user_id: str, quiz_id: Optional[str] = None, user_program_id: Optional[str] = None) -> List[QuizAttempt]:
         """Get quiz attempts for a user from MongoDB."""
         try:
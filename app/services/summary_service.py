@@ -1,4 +1,4 @@
-import google.generativeai as genai
+from app.core.gemini import get_gemini_model
 from typing import Optional
 import logging
 from app.core.config import settings
@@ -13,9 +13,7 @@ class SummaryService:
             return
         
         try:
-            genai.configure(api_key=settings.google_api_key)
-            # Use the correct model name for the current API version
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = get_gemini_model()
             logger.info("Google Generative AI service initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Google Generative AI: {e}")
@@ -59,7 +57,7 @@ class SummaryService:
             prompt = self._create_prompt(text, max_length, style)
             
             # Generate summary
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             
             if not response.text:
                 return {
@@ -137,7 +135,7 @@ class SummaryService:
             Format each key point as a clear, concise statement. Number them 1-{num_points}.
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             
             if not response.text:
                 return {
@@ -205,7 +203,7 @@ class SummaryService:
             Explanation: [brief explanation]
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             
             if not response.text:
                 return {
@@ -4,11 +4,21 @@ import asyncio
 from typing import Optional, Dict, Any
 from datetime import datetime
 from bson import ObjectId
+from google.api_core import exceptions as google_exceptions
 
-import google.generativeai as genai
+from app.core import course_cache
+from app.core.gemini import get_gemini_model
 from app.core.mongodb import get_database
 from app.core.config import settings
 
+# Gemini errors worth retrying: rate limits and transient server-side failures
+_TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
 
 class TranslationService:
     """Service for handling translations using Google Gemini API"""
@@ -28,8 +38,7 @@ class TranslationService:
             if not api_key:
                 raise Exception("Google API key not configured in settings")
             
-            genai.configure(api_key=api_key)
-            self._gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            self._gemini_model = get_gemini_model()
             print("✅ Gemini API initialized successfully")
         except Exception as e:
             print(f"❌ Error initializing Gemini API: {e}")
@@ -86,11 +95,20 @@ TRANSLATED CONTENT:"""
         try:
             prompt = self._create_translation_prompt(content, target_language)
             
-            # Generate translation
-            response = await asyncio.to_thread(
-                self._gemini_model.generate_content, 
-                prompt
-            )
+            # Generate translation, backing off and retrying on rate limits and transient errors
+            for attempt in range(settings.gemini_max_retries + 1):
+                try:
+                    response = await asyncio.to_thread(
+                        self._gemini_model.generate_content, 
+                        prompt
+                    )
+                    break
+                except _TRANSIENT_ERRORS as e:
+                    if attempt == settings.gemini_max_retries:
+                        raise
+                    delay = settings.gemini_retry_base_delay * (2 ** attempt)
+                    print(f"⚠️ Gemini call failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
             
             if response and response.text:
                 # Clean up the response - remove extra newlines and whitespace
@@ -167,6 +185,7 @@ TRANSLATED CONTENT:"""
             translated_content = await self.translate_content(str(original_asset["content"]), target_language)
             
             # Create new asset record for translation
+            now = datetime.utcnow()
             translation_asset = {
                 "name": original_asset["name"],  # Keep original name for now
                 "style": original_asset["style"],
@@ -174,26 +193,23 @@ TRANSLATED CONTENT:"""
                 "code": ObjectId(asset_code),  # Store code as ObjectId
                 "language": target_language,
                 "source_asset_id": str(original_asset["_id"]),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
             
             # Insert translation into database
             result = await self.assets_collection.insert_one(translation_asset)
+            course_cache.invalidate()
             
             if result.inserted_id:
-                # Get the created translation
-                created_translation = await self.assets_collection.find_one({"_id": result.inserted_id})
-                if created_translation:
-                    created_translation["_id"] = str(created_translation["_id"])
-                    # Convert code to string if it's an ObjectId
-                    if isinstance(created_translation.get("code"), ObjectId):
-                        created_translation["code"] = str(created_translation["code"])
-                    # Convert datetime to ISO format
-                    if created_translation.get("created_at"):
-                        created_translation["created_at"] = created_translation["created_at"].isoformat()
-                    if created_translation.get("updated_at"):
-                        created_translation["updated_at"] = created_translation["updated_at"].isoformat()
+                # Build the response from the inserted document rather than reading it back
+                created_translation = {
+                    **translation_asset,
+                    "_id": str(result.inserted_id),
+                    "code": str(translation_asset["code"]),
+                    "created_at": now.isoformat(),
+                    "updated_at": now.isoformat()
+                }
                 return created_translation
             else:
                 raise Exception("Failed to create translation")
@@ -1,5 +1,22 @@
 from typing import Any, Dict, Optional
-from fastapi.responses import JSONResponse
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+
+def _bson_default(value: Any) -> Any:
+    """Encode BSON types orjson does not know about; datetimes are handled natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """ORJSONResponse that renders raw Mongo documents without a per-field conversion pass."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_bson_default, option=orjson.OPT_NON_STR_KEYS)
 
 
 def success_response(
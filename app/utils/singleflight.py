@@ -0,0 +1,43 @@
+"""
+Coalescing of concurrent identical async calls.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    """Mark a failed call's exception as retrieved so it is not logged when nobody awaited it."""
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await ``func()`` unless a call for ``key`` is already running, then await that one."""
+        task = self._inflight.get(key)
+        if task is None:
+            # The call runs in its own task so cancelling whichever caller started it leaves the others unaffected
+            task = asyncio.ensure_future(func())
+            task.add_done_callback(_consume_exception)
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._inflight[key] = task
+        # Shield so a disconnecting caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+
+from app.core.mongodb import get_database
+from app.main import app
+
+client = TestClient(app)
+
+TRANSFORM_REQUEST = {
+    "assetCode": "ASSET001",
+    "style": "original",
+    "content": "Photosynthesis converts sunlight into chemical energy.",
+    "domain": "Biology",
+    "hobby": "Cricket"
+}
+
+
+class FakeCollection:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.documents = []
+
+    async def insert_one(self, document):
+        if self.fail:
+            raise ConnectionError("write failed")
+        self.documents.append(document)
+
+    async def insert_many(self, documents, ordered=True):
+        if self.fail:
+            raise ConnectionError("write failed")
+        self.documents.extend(documents)
+
+
+def _override_db(collection):
+    app.dependency_overrides[get_database] = lambda: {"assets": collection}
+
+
+def test_transform_saves_asset_after_responding():
+    """Test that /transform hands out the pre-assigned ID and writes the asset in the background."""
+    collection = FakeCollection()
+    _override_db(collection)
+    try:
+        response = client.post("/api/v1/content-transformer/transform", json=TRANSFORM_REQUEST)
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert [str(document["_id"]) for document in collection.documents] == [response.json()["id"]]
+
+
+def test_transform_sync_returns_id_of_saved_asset():
+    """Test that /transform?sync=true answers only after the asset it names has been written."""
+    collection = FakeCollection()
+    _override_db(collection)
+    try:
+        response = client.post("/api/v1/content-transformer/transform?sync=true", json=TRANSFORM_REQUEST)
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert [str(document["_id"]) for document in collection.documents] == [response.json()["id"]]
+
+
+def test_transform_sync_reports_failed_save():
+    """Test that /transform?sync=true does not hand out an ID when the asset could not be written."""
+    _override_db(FakeCollection(fail=True))
+    try:
+        response = client.post("/api/v1/content-transformer/transform?sync=true", json=TRANSFORM_REQUEST)
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 500
+    assert "id" not in response.json()
@@ -0,0 +1,109 @@
+import asyncio
+
+from app.core import llm_cache
+
+
+def test_llm_cache_reuses_completions():
+    """Test that a cached completion is returned without calling the LLM again."""
+    llm_cache.clear()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return "transformed"
+
+    key = llm_cache.make_key("transform", "summary", "Business", "Cricket", "content")
+
+    async def run():
+        first = await llm_cache.get_or_set(key, generate)
+        second = await llm_cache.get_or_set(key, generate)
+        return first, second
+
+    assert asyncio.run(run()) == ("transformed", "transformed")
+    assert len(calls) == 1
+
+
+def test_llm_cache_skips_empty_completions():
+    """Test that empty completions are not cached."""
+    llm_cache.clear()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return ""
+
+    key = llm_cache.make_key("transform", "summary", "Business", "Cricket", "empty")
+
+    async def run():
+        await llm_cache.get_or_set(key, generate)
+        await llm_cache.get_or_set(key, generate)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_llm_cache_respects_should_cache():
+    """Test that completions rejected by should_cache are returned but not cached."""
+    llm_cache.clear()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return "unparseable"
+
+    key = llm_cache.make_key("llm", "quiz", "content")
+
+    async def run():
+        first = await llm_cache.get_or_set(key, generate, should_cache=lambda value: False)
+        await llm_cache.get_or_set(key, generate, should_cache=lambda value: False)
+        return first
+
+    assert asyncio.run(run()) == "unparseable"
+    assert len(calls) == 2
+
+
+def test_llm_cache_coalesces_concurrent_misses():
+    """Test that concurrent misses for the same key share one LLM call."""
+    llm_cache.clear()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "explanation"
+
+    key = llm_cache.make_key("llm", "explanation", "content")
+
+    async def run():
+        return await asyncio.gather(*(llm_cache.get_or_set(key, generate) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["explanation"] * 5
+    assert len(calls) == 1
+
+
+def test_llm_cache_counts_hits_and_misses():
+    """Test that get_or_set reports hits and misses through stats()."""
+    llm_cache.clear()
+
+    async def generate():
+        return "summary"
+
+    key = llm_cache.make_key("summary", "summarize", "text")
+
+    async def run():
+        await llm_cache.get_or_set(key, generate)
+        await llm_cache.get_or_set(key, generate)
+        await llm_cache.get_or_set(key, generate)
+
+    asyncio.run(run())
+    assert llm_cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+    llm_cache.clear()
+    assert llm_cache.stats() == {"hits": 0, "misses": 0, "size": 0}
+
+
+def test_llm_cache_keys_do_not_collide_across_field_splits():
+    """Test that moving text across field boundaries produces a different key."""
+    assert llm_cache.make_key("transform", "summary", "a|b", "c", "content") != llm_cache.make_key(
+        "transform", "summary", "a", "b|c", "content"
+    )
+    assert llm_cache.make_key("transform", "ab", "c") != llm_cache.make_key("transform", "a", "bc")
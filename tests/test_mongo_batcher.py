@@ -0,0 +1,40 @@
+import asyncio
+
+from app.core.mongo_batcher import MongoBatcher
+
+
+class FakeCollection:
+    def __init__(self):
+        self.calls = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append(len(documents))
+        for index, document in enumerate(documents):
+            document.setdefault("_id", f"id-{len(self.calls)}-{index}")
+
+
+def test_mongo_batcher_coalesces_inserts():
+    """Test that inserts submitted within one window share a single insert_many."""
+    collection = FakeCollection()
+    db = {"assets": collection}
+    batcher = MongoBatcher(max_batch=10, window=0.01)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(db, "assets", {"n": n}) for n in range(3)))
+
+    ids = asyncio.run(run())
+    assert collection.calls == [3]
+    assert ids == ["id-1-0", "id-1-1", "id-1-2"]
+
+
+def test_mongo_batcher_flushes_full_batches():
+    """Test that a full batch is written without waiting for the window."""
+    collection = FakeCollection()
+    db = {"assets": collection}
+    batcher = MongoBatcher(max_batch=2, window=10)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(db, "assets", {"n": n}) for n in range(2)))
+
+    asyncio.run(run())
+    assert collection.calls == [2]
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from app.prompts.transformer import build_profile_prompt, build_prompt, postprocess
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+CONTENT = "Neural networks learn patterns from data."
+
+
+def test_build_prompt_matches_golden():
+    """Test that the transformer prompt only changes when the golden file is updated too."""
+    expected = (GOLDEN_DIR / "transformer_summary_prompt.txt").read_text(encoding="utf-8")
+    assert build_prompt("summary", CONTENT, "Business", "Cricket") == expected
+
+
+def test_build_profile_prompt_matches_golden():
+    """Test that the /getAsset prompt only changes when the golden file is updated too."""
+    expected = (GOLDEN_DIR / "transformer_profile_storytelling_prompt.txt").read_text(encoding="utf-8")
+    assert build_profile_prompt("storytelling", CONTENT, "business-student", "Cricket") == expected
+
+
+def test_build_prompt_falls_back_to_summary():
+    """Test that unknown styles use the summary instructions."""
+    prompt = build_prompt("unknown", CONTENT, "Business", "Cricket")
+    assert "### Summary Mode:" in prompt
+
+
+def test_postprocess_strips_quotes():
+    """Test that surrounding whitespace and quotes are removed from completions."""
+    assert postprocess('  "Hello"\n') == "Hello"
+    assert postprocess('"') == '"'
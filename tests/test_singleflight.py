@@ -0,0 +1,64 @@
+import asyncio
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """Test that concurrent calls for the same key share one execution."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+
+def test_singleflight_propagates_errors():
+    """Test that an error raised by the shared call reaches every caller."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_singleflight_survives_leader_cancellation():
+    """Test that cancelling the caller that started the shared call does not cancel it for the others."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        return leader.cancelled(), result
+
+    assert asyncio.run(run()) == (True, "done")
+    assert len(calls) == 1
+    assert len(flight) == 0